@@ -1,63 +1,396 @@
 # backend/ai_generator.py
 import os
-from openai import OpenAI
+import re
+import json
+import asyncio
+import inspect
+import time
+import random
+import hashlib
+import threading
+from collections import ChainMap, OrderedDict
+from functools import lru_cache, wraps
+from openai import OpenAI, AsyncOpenAI
 import openai as openai_legacy
 
-def _get_new_client(api_key=None):
+@lru_cache(maxsize=32)
+def _client_for(key):
     """
-    Returns a new OpenAI client using either provided key or environment variable.
+    Returns a shared OpenAI client per API key so its HTTP connection pool
+    (keep-alive to api.openai.com) is reused across requests.
     """
+    return OpenAI(api_key=key, max_retries=0)
+
+def _resolve_key(api_key=None):
     key = api_key or os.environ.get("OPENAI_API_KEY")
     if not key:
         raise Exception("OPENAI_API_KEY not set in environment or passed in.")
-    return OpenAI(api_key=key)
+    return key
+
+def _get_new_client(api_key=None):
+    """
+    Returns an OpenAI client using either provided key or environment variable.
+    """
+    return _client_for(_resolve_key(api_key))
+
+def _get_async_client(api_key=None):
+    """
+    Returns a new AsyncOpenAI client. Async clients hold connections bound to
+    the running event loop, so one is created per batch rather than cached.
+    """
+    return AsyncOpenAI(api_key=_resolve_key(api_key), max_retries=0)
+
+# ----------------------
+# RATE LIMITING & BACKOFF
+# ----------------------
+RPM_LIMIT = int(os.environ.get("OPENAI_RPM_LIMIT", 3000))
+TPM_LIMIT = int(os.environ.get("OPENAI_TPM_LIMIT", 200000))
+EXPECTED_COMPLETION_TOKENS = 300
+MAX_TRIES = 6
+BACKOFF_BASE = 1.0
+BACKOFF_CAP = 60.0
+RETRYABLE_ERRORS = (
+    openai_legacy.RateLimitError,
+    openai_legacy.APITimeoutError,
+    openai_legacy.APIConnectionError,
+)
+
+class _RateLimiter:
+    """
+    Token bucket refilled continuously at `rate` units per `period` seconds.
+    Callers reserve capacity up front and sleep off any deficit, so the lock
+    is never held while waiting.
+    """
+    def __init__(self, rate, period=60.0):
+        self.capacity = float(rate)
+        self.fill_rate = rate / period
+        self.tokens = float(rate)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _reserve(self, amount):
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.fill_rate)
+            self.updated = now
+            self.tokens -= min(amount, self.capacity)
+            return max(0.0, -self.tokens / self.fill_rate)
 
-def _try_new_client(prompt_messages, model="gpt-4o-mini", temperature=0.8, api_key=None):
+    def acquire(self, amount=1):
+        wait = self._reserve(amount)
+        if wait:
+            time.sleep(wait)
+
+    async def aacquire(self, amount=1):
+        wait = self._reserve(amount)
+        if wait:
+            await asyncio.sleep(wait)
+
+_request_limiter = _RateLimiter(RPM_LIMIT)
+_token_limiter = _RateLimiter(TPM_LIMIT)
+
+def _estimate_tokens(prompt_messages):
+    """Rough token count (~4 characters per token) plus the expected completion."""
+    chars = sum(len(str(m.get("content", ""))) for m in prompt_messages)
+    return chars // 4 + EXPECTED_COMPLETION_TOKENS
+
+def _retry_delay(attempt, error):
+    """Honours Retry-After on 429s, otherwise exponential backoff with full jitter."""
+    response = getattr(error, "response", None)
+    retry_after = response.headers.get("retry-after") if response is not None else None
+    if retry_after:
+        try:
+            return min(float(retry_after), BACKOFF_CAP)
+        except ValueError:
+            pass
+    return random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt))
+
+def _try_new_client(prompt_messages, model="gpt-4o-mini", temperature=0.8, api_key=None, stream=False):
     client = _get_new_client(api_key)
-    return client.chat.completions.create(model=model, messages=prompt_messages, temperature=temperature)
+    tokens = _estimate_tokens(prompt_messages)
+    for attempt in range(MAX_TRIES):
+        _request_limiter.acquire()
+        _token_limiter.acquire(tokens)
+        try:
+            return client.chat.completions.create(model=model, messages=prompt_messages, temperature=temperature, stream=stream)
+        except RETRYABLE_ERRORS as e:
+            if attempt == MAX_TRIES - 1:
+                raise
+            time.sleep(_retry_delay(attempt, e))
+
+async def _atry_new_client(client, prompt_messages, model="gpt-4o-mini", temperature=0.8):
+    tokens = _estimate_tokens(prompt_messages)
+    for attempt in range(MAX_TRIES):
+        await _request_limiter.aacquire()
+        await _token_limiter.aacquire(tokens)
+        try:
+            return await client.chat.completions.create(model=model, messages=prompt_messages, temperature=temperature)
+        except RETRYABLE_ERRORS as e:
+            if attempt == MAX_TRIES - 1:
+                raise
+            await asyncio.sleep(_retry_delay(attempt, e))
 
 def _try_legacy(prompt_messages, model="gpt-3.5-turbo", temperature=0.8):
     key = os.environ.get("OPENAI_API_KEY")
     if not key:
         raise Exception("OPENAI_API_KEY not set in environment.")
-    openai_legacy.api_key = key
+    if openai_legacy.api_key != key:
+        openai_legacy.api_key = key
     return openai_legacy.ChatCompletion.create(model=model, messages=prompt_messages, temperature=temperature)
 
+# ----------------------
+# RESPONSE CACHE
+# ----------------------
+CACHE_TTL = 3600
+CACHE_MAXSIZE = 1024
+_response_cache = OrderedDict()
+_cache_lock = threading.Lock()
+cache_stats = {"hits": 0, "misses": 0, "template_hits": 0}
+
+def _cache_key(kind, data, model, temperature):
+    payload = json.dumps({"fn": kind, "data": data, "model": model, "temp": temperature}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+def _is_cacheable(data, temperature):
+    """
+    Sampled output (temperature > 0) is only cached when the caller opts in
+    by passing a `_cache_seed` in the data dict.
+    """
+    return temperature == 0 or data.get("_cache_seed") is not None
+
+def _cache_get(key):
+    with _cache_lock:
+        entry = _response_cache.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del _response_cache[key]
+            return None
+        _response_cache.move_to_end(key)
+        return value
+
+def _cache_set(key, value, ttl):
+    with _cache_lock:
+        _response_cache[key] = (time.monotonic() + ttl, value)
+        _response_cache.move_to_end(key)
+        while len(_response_cache) > CACHE_MAXSIZE:
+            _response_cache.popitem(last=False)
+
+def clear_response_cache():
+    with _cache_lock:
+        _response_cache.clear()
+        for k in cache_stats:
+            cache_stats[k] = 0
+
+def llm_cache(kind, model="gpt-4o-mini", temperature=0.8, ttl=CACHE_TTL):
+    """
+    Caches generated text keyed on sha256 of (kind, data, model, temperature)
+    in an in-memory LRU so identical requests skip the OpenAI call.
+    """
+    def decorator(fn):
+        if inspect.iscoroutinefunction(fn):
+            @wraps(fn)
+            async def async_wrapper(data, api_key=None, **kwargs):
+                if not _is_cacheable(data, temperature):
+                    return await fn(data, api_key=api_key, **kwargs)
+                key = _cache_key(kind, data, model, temperature)
+                cached = _cache_get(key)
+                if cached is not None:
+                    cache_stats["hits"] += 1
+                    return cached
+                cache_stats["misses"] += 1
+                result = await fn(data, api_key=api_key, **kwargs)
+                _cache_set(key, result, ttl)
+                return result
+            return async_wrapper
+
+        @wraps(fn)
+        def wrapper(data, api_key=None, **kwargs):
+            if not _is_cacheable(data, temperature):
+                return fn(data, api_key=api_key, **kwargs)
+            key = _cache_key(kind, data, model, temperature)
+            cached = _cache_get(key)
+            if cached is not None:
+                cache_stats["hits"] += 1
+                return cached
+            cache_stats["misses"] += 1
+            result = fn(data, api_key=api_key, **kwargs)
+            _cache_set(key, result, ttl)
+            return result
+        return wrapper
+    return decorator
+
+# ----------------------
+# LISTING TEMPLATE CACHE
+# ----------------------
+# Listings for the same car cohort only differ in a few slot values, so a
+# generated listing whose slot values can all be found in its text is kept
+# with those values swapped for placeholders, and the skeleton is reused for
+# later cars in the cohort with a local substitution. The prompt itself is
+# never changed, so cached and uncached listings come from the same request.
+LISTING_SLOTS = {
+    "year": "{{YEAR}}",
+    "mileage": "{{MILEAGE}}",
+    "color": "{{COLOUR}}",
+    "price": "{{PRICE}}",
+}
+
+def _listing_cohort(data):
+    fields = ("tone", "make", "model", "fuel", "transmission", "features", "notes")
+    return {f: str(data.get(f) or "").strip().lower() for f in fields}
+
+def _fill_template(template, data):
+    text = template
+    for field, token in LISTING_SLOTS.items():
+        text = text.replace(token, str(data.get(field, "")))
+    return text
+
+def _extract_template(text, data):
+    """
+    `text` with each slot value replaced by its placeholder, or None unless
+    every slot value is set, distinct and appears verbatim as a whole word.
+    """
+    values = [str(data.get(field) or "").strip() for field in LISTING_SLOTS]
+    if not all(values) or len({v.lower() for v in values}) < len(values):
+        return None
+    for value, token in zip(values, LISTING_SLOTS.values()):
+        pattern = r"(?<!\w)" + re.escape(value) + r"(?!\w)"
+        text, found = re.subn(pattern, lambda _: token, text, flags=re.IGNORECASE)
+        if not found:
+            return None
+    return text
+
+def _lookup_listing_template(data):
+    """
+    Returns (template_key, cached_text) for a listing request; template_key is
+    None when the request isn't cacheable.
+    """
+    if not _is_cacheable(data, 0.8):
+        return None, None
+    template_key = _cache_key("listing_template", _listing_cohort(data), "gpt-4o-mini", 0.8)
+    template = _cache_get(template_key)
+    if template is not None:
+        cache_stats["template_hits"] += 1
+        return template_key, _fill_template(template, data)
+    return template_key, None
+
+def _finish_listing(text, data, template_key):
+    if template_key:
+        template = _extract_template(text, data)
+        if template is not None:
+            _cache_set(template_key, template, CACHE_TTL)
+    return text
+
+# ----------------------
+# PROMPTS
+# ----------------------
+# Prompt bodies are built once at import; each call only fills the slots.
+# Missing keys render as "None", matching data.get() in an f-string.
+_LISTING_PROMPT = "".join((
+    "\n",
+    "You are an expert car sales assistant. Create a compelling 100–150 word listing in separate paragraphs with emojis.\n",
+    "Tone: {tone}\n",
+    "Car: {year} {make} {model}\n",
+    "Mileage: {mileage}\n",
+    "Colour: {color}\n",
+    "Fuel: {fuel}\n",
+    "Transmission: {transmission}\n",
+    "Price: {price}\n",
+    "Features: {features}\n",
+    "Dealer notes: {notes}\n",
+)).format_map
+_CAPTION_PROMPT = "Create a short, catchy Instagram/TikTok caption for this car: {make} {model}. Description: {desc}".format_map
+_PROMPT_DEFAULTS = dict.fromkeys(
+    ("year", "make", "model", "mileage", "color", "fuel", "transmission", "price", "features", "notes", "desc")
+)
+_PROMPT_DEFAULTS["tone"] = "Professional"
+_LISTING_SYSTEM_MESSAGE = {"role": "system", "content": "You are a helpful car sales assistant."}
+
+def _listing_messages(data):
+    user_message = {"role": "user", "content": _LISTING_PROMPT(ChainMap(data, _PROMPT_DEFAULTS))}
+    return [_LISTING_SYSTEM_MESSAGE, user_message]
+
+def _caption_messages(data):
+    return [{"role": "user", "content": _CAPTION_PROMPT(ChainMap(data, _PROMPT_DEFAULTS))}]
+
+# ----------------------
+# GENERATORS
+# ----------------------
+@llm_cache("listing", temperature=0.8)
 def generate_listing(data, api_key=None):
     """
     Generates a car listing using OpenAI. Accepts optional api_key for user input.
     """
-    tone = data.get("tone", "Professional")
-    prompt_messages = [
-        {"role": "system", "content": "You are a helpful car sales assistant."},
-        {"role": "user", "content": f"""
-You are an expert car sales assistant. Create a compelling 100–150 word listing in separate paragraphs with emojis.
-Tone: {tone}
-Car: {data.get('year')} {data.get('make')} {data.get('model')}
-Mileage: {data.get('mileage')}
-Colour: {data.get('color')}
-Fuel: {data.get('fuel')}
-Transmission: {data.get('transmission')}
-Price: {data.get('price')}
-Features: {data.get('features')}
-Dealer notes: {data.get('notes')}
-"""}
-    ]
+    template_key, cached = _lookup_listing_template(data)
+    if cached is not None:
+        return cached
+
+    prompt_messages = _listing_messages(data)
     try:
         resp = _try_new_client(prompt_messages, api_key=api_key)
-        return resp.choices[0].message.content
+        text = resp.choices[0].message.content
     except Exception:
         try:
             resp = _try_legacy(prompt_messages)
-            return resp['choices'][0]['message']['content']
+            text = resp['choices'][0]['message']['content']
         except Exception as e:
             raise Exception(f"OpenAI call failed: {e}")
+    return _finish_listing(text, data, template_key)
 
+def generate_listing_stream(data, api_key=None):
+    """
+    Same as generate_listing but yields the text in chunks as the model
+    produces them, so the UI can render progressively. Cache hits are
+    yielded in one piece.
+    """
+    cacheable = _is_cacheable(data, 0.8)
+    if cacheable:
+        key = _cache_key("listing", data, "gpt-4o-mini", 0.8)
+        cached = _cache_get(key)
+        if cached is not None:
+            cache_stats["hits"] += 1
+            yield cached
+            return
+        template_key, templated = _lookup_listing_template(data)
+        if templated is not None:
+            yield templated
+            return
+        cache_stats["misses"] += 1
+
+    prompt_messages = _listing_messages(data)
+    try:
+        stream = _try_new_client(prompt_messages, api_key=api_key, stream=True)
+    except Exception:
+        try:
+            resp = _try_legacy(prompt_messages)
+            stream = None
+            text = resp['choices'][0]['message']['content']
+        except Exception as e:
+            raise Exception(f"OpenAI call failed: {e}")
+
+    if stream is None:
+        parts = [text]
+        yield text
+    else:
+        parts = []
+        for chunk in stream:
+            delta = chunk.choices[0].delta.content if chunk.choices else None
+            if delta:
+                parts.append(delta)
+                yield delta
+
+    if cacheable:
+        text = "".join(parts)
+        _cache_set(key, text, CACHE_TTL)
+        _finish_listing(text, data, template_key)
+
+@llm_cache("caption", temperature=0.9)
 def generate_caption(data, api_key=None):
     """
     Generates a short social media caption for a car.
     """
-    prompt_messages = [{"role": "user", "content": f"Create a short, catchy Instagram/TikTok caption for this car: {data.get('make')} {data.get('model')}. Description: {data.get('desc')}"}]
+    prompt_messages = _caption_messages(data)
     try:
         resp = _try_new_client(prompt_messages, temperature=0.9, api_key=api_key)
         return resp.choices[0].message.content
@@ -67,3 +400,131 @@ def generate_caption(data, api_key=None):
             return resp['choices'][0]['message']['content']
         except Exception as e:
             raise Exception(f"Caption generation failed: {e}")
+
+# ----------------------
+# ASYNC / MULTI-CAR GENERATION
+# ----------------------
+MAX_CONCURRENT_REQUESTS = 20
+
+@llm_cache("listing", temperature=0.8)
+async def agenerate_listing(data, api_key=None, client=None):
+    """
+    Async variant of generate_listing. Pass a shared AsyncOpenAI `client` when
+    generating many listings at once.
+    """
+    template_key, cached = _lookup_listing_template(data)
+    if cached is not None:
+        return cached
+
+    prompt_messages = _listing_messages(data)
+    try:
+        resp = await _atry_new_client(client or _get_async_client(api_key), prompt_messages)
+        text = resp.choices[0].message.content
+    except Exception:
+        try:
+            resp = await asyncio.to_thread(_try_legacy, prompt_messages)
+            text = resp['choices'][0]['message']['content']
+        except Exception as e:
+            raise Exception(f"OpenAI call failed: {e}")
+    return _finish_listing(text, data, template_key)
+
+@llm_cache("caption", temperature=0.9)
+async def agenerate_caption(data, api_key=None, client=None):
+    """
+    Async variant of generate_caption.
+    """
+    prompt_messages = _caption_messages(data)
+    try:
+        resp = await _atry_new_client(client or _get_async_client(api_key), prompt_messages, temperature=0.9)
+        return resp.choices[0].message.content
+    except Exception:
+        try:
+            resp = await asyncio.to_thread(_try_legacy, prompt_messages, temperature=0.9)
+            return resp['choices'][0]['message']['content']
+        except Exception as e:
+            raise Exception(f"Caption generation failed: {e}")
+
+async def _agenerate_many(agenerate, items, api_key=None, max_concurrency=MAX_CONCURRENT_REQUESTS):
+    client = _get_async_client(api_key)
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def run(data):
+        async with semaphore:
+            return await agenerate(data, api_key=api_key, client=client)
+
+    try:
+        return await asyncio.gather(*[run(data) for data in items], return_exceptions=True)
+    finally:
+        await client.close()
+
+def generate_listings(cars, api_key=None, max_concurrency=MAX_CONCURRENT_REQUESTS):
+    """
+    Generates listings for several cars concurrently. Returns a list in the
+    same order as `cars`; failed generations come back as Exception objects.
+    """
+    return asyncio.run(_agenerate_many(agenerate_listing, cars, api_key, max_concurrency))
+
+def generate_captions(items, api_key=None, max_concurrency=MAX_CONCURRENT_REQUESTS):
+    """
+    Generates captions for several cars concurrently (see generate_listings).
+    """
+    return asyncio.run(_agenerate_many(agenerate_caption, items, api_key, max_concurrency))
+
+# ----------------------
+# BATCH API (OFFLINE BULK GENERATION)
+# ----------------------
+# Regenerating listings for a whole inventory needs no immediate answer: the
+# Batch API takes them as one JSONL upload, at half the token price and
+# outside the per-minute rate limits, and completes within 24 hours.
+BATCH_COMPLETION_WINDOW = "24h"
+BATCH_RUNNING_STATUSES = ("validating", "in_progress", "finalizing", "cancelling")
+
+def submit_listing_batch(cars, api_key=None, model="gpt-4o-mini", temperature=0.8):
+    """
+    Submits listing generation for every car in `cars` as one Batch API job
+    and returns the job id; pass it to collect_listing_batch.
+    """
+    lines = [
+        json.dumps({
+            "custom_id": str(i),
+            "method": "POST",
+            "url": "/v1/chat/completions",
+            "body": {"model": model, "messages": _listing_messages(data), "temperature": temperature},
+        })
+        for i, data in enumerate(cars)
+    ]
+    client = _get_new_client(api_key)
+    batch_file = client.files.create(file=("listings.jsonl", "\n".join(lines).encode("utf-8")), purpose="batch")
+    job = client.batches.create(
+        input_file_id=batch_file.id,
+        endpoint="/v1/chat/completions",
+        completion_window=BATCH_COMPLETION_WINDOW,
+    )
+    return job.id
+
+def collect_listing_batch(job_id, api_key=None):
+    """
+    Results of a submit_listing_batch job: None while it is still running,
+    otherwise one listing per submitted car, in order (an Exception object in
+    place of any request that failed or never ran).
+    """
+    client = _get_new_client(api_key)
+    job = client.batches.retrieve(job_id)
+    if job.status in BATCH_RUNNING_STATUSES:
+        return None
+    if job.status == "failed":
+        raise Exception(f"Listing batch {job_id} failed: {job.errors}")
+
+    results = [Exception("No result returned") for _ in range(job.request_counts.total)]
+    for file_id in (job.output_file_id, job.error_file_id):
+        if not file_id:
+            continue
+        for line in client.files.content(file_id).text.splitlines():
+            row = json.loads(line)
+            response = row.get("response") or {}
+            if response.get("status_code") == 200:
+                text = response["body"]["choices"][0]["message"]["content"]
+            else:
+                text = Exception(f"Listing generation failed: {row.get('error') or response.get('body')}")
+            results[int(row["custom_id"])] = text
+    return results
@@ -1,9 +1,24 @@
 # backend/analytics.py
 
+import os
+import time
+import hashlib
+import stat
+import tempfile
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 
+try:
+    import polars as pl
+    import pyarrow  # pl.from_pandas needs it for string/category columns
+    POLARS_AVAILABLE = True
+    # What the Polars fast paths raise on data they can't convert (e.g. a
+    # mixed-type object column); those fall back to pandas, anything else is a bug
+    POLARS_FALLBACK_ERRORS = (pl.exceptions.PolarsError, pyarrow.ArrowException)
+except ModuleNotFoundError:
+    POLARS_AVAILABLE = False
+
 # ---------------------------------------------------------
 # IMPORTS (backend deps)
 # ---------------------------------------------------------
@@ -43,15 +58,44 @@ def _parse_price(value):
         return None
 
 
+def _parse_price_series(series):
+    """
+    Vectorised _parse_price for a whole column. Unparseable values become NaN.
+    """
+    s = series.astype("string").str.lower().str.strip()
+    s = s.str.replace("£", "", regex=False).str.replace(",", "", regex=False).str.replace(" ", "", regex=False)
+    is_k = s.str.endswith("k", na=False)
+    base = pd.to_numeric(s.where(~is_k, s.str[:-1]), errors="coerce").astype(float)
+    return base.mask(is_k, base * 1000)
+
+
+def ensure_parsed_price(df):
+    """
+    Adds a numeric ParsedPrice column parsed from Price, unless the frame
+    already has one, so every consumer shares a single parse.
+    Returns the ParsedPrice Series, or None if there is no Price column.
+    """
+    if "ParsedPrice" not in df.columns:
+        if "Price" not in df.columns:
+            return None
+        df["ParsedPrice"] = _parse_price_series(df["Price"])
+    return df["ParsedPrice"]
+
+
 # ---------------------------------------------------------
 # CLEAN INVENTORY
 # ---------------------------------------------------------
+CATEGORY_COLUMNS = ("Make", "Model", "Platform")
+
+
 def clean_inventory(df):
     """Standardises inventory columns & price fields for analytics."""
     if df is None or df.empty:
         return pd.DataFrame()
 
-    df = df.copy()
+    # Shallow copy: columns are replaced below, never written in place, so the
+    # caller's frame is untouched without duplicating its data.
+    df = df.copy(deep=False)
 
     # Standard column names
     rename_map = {
@@ -63,21 +107,21 @@ def clean_inventory(df):
         "year": "Year"
     }
 
-    df.rename(columns={c: rename_map.get(c.lower(), c) for c in df.columns}, inplace=True)
+    df.columns = [rename_map.get(str(c).lower(), c) for c in df.columns]
 
     # Parse price
-    if "Price" in df.columns:
-        df["ParsedPrice"] = df["Price"].apply(_parse_price)
-    else:
+    if ensure_parsed_price(df) is None:
         df["ParsedPrice"] = None
 
-    # Parse Year safely
-    if "Year" in df.columns:
-        df["Year"] = pd.to_numeric(df["Year"], errors="coerce")
+    # Parse Year / Mileage safely (coerced together in one call)
+    numeric_cols = [c for c in ["Year", "Mileage"] if c in df.columns]
+    if numeric_cols:
+        df[numeric_cols] = df[numeric_cols].apply(pd.to_numeric, errors="coerce")
 
-    # Parse Mileage safely
-    if "Mileage" in df.columns:
-        df["Mileage"] = pd.to_numeric(df["Mileage"], errors="coerce")
+    # Low-cardinality labels: category codes make groupby hash ints, not strings
+    for col in CATEGORY_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].astype("category")
 
     return df
 
@@ -94,25 +138,65 @@ def clean_social(df):
     if df is None or df.empty:
         return pd.DataFrame()
 
-    df = df.copy()
+    df = df.copy(deep=False)
 
     # Fix date column
     if "Date" in df.columns:
         df["Date"] = pd.to_datetime(df["Date"], errors="coerce")
 
-    # Numeric metrics
-    numeric_cols = ["Views", "Likes", "Comments", "Shares", "Reach"]
-    for col in numeric_cols:
-        if col in df.columns:
-            df[col] = pd.to_numeric(df[col], errors="coerce").fillna(0)
+    # Numeric metrics (coerced together in one call)
+    numeric_cols = [c for c in ["Views", "Likes", "Comments", "Shares", "Reach"] if c in df.columns]
+    if numeric_cols:
+        df[numeric_cols] = df[numeric_cols].apply(pd.to_numeric, errors="coerce").fillna(0)
 
     # Standard platform names
     if "Platform" in df.columns:
-        df["Platform"] = df["Platform"].astype(str).str.title()
+        df["Platform"] = df["Platform"].astype(str).str.title().astype("category")
 
     return df
 
 
+# ---------------------------------------------------------
+# FUSED NUMERIC STATS (min / max / mean in one scan)
+# ---------------------------------------------------------
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ModuleNotFoundError:
+    NUMBA_AVAILABLE = False
+
+
+def _nan_stats_py(a):
+    mn = np.inf
+    mx = -np.inf
+    s = 0.0
+    n = 0
+    for v in a:
+        if v == v:
+            if v < mn:
+                mn = v
+            if v > mx:
+                mx = v
+            s += v
+            n += 1
+    return mn, mx, (s / n if n else 0.0), n
+
+if NUMBA_AVAILABLE:
+    _nan_stats = njit(cache=True)(_nan_stats_py)
+else:
+    def _nan_stats(a):
+        n = int(np.count_nonzero(~np.isnan(a)))
+        if not n:
+            return np.inf, -np.inf, 0.0, 0
+        return np.nanmin(a), np.nanmax(a), np.nanmean(a), n
+
+
+def column_stats(series):
+    """(min, max, mean, count) of a numeric column, ignoring NaN, in one pass."""
+    values = pd.to_numeric(series, errors="coerce").to_numpy(dtype=np.float64, na_value=np.nan)
+    return _nan_stats(values)
+
+
 # ---------------------------------------------------------
 # INVENTORY SUMMARY
 # ---------------------------------------------------------
@@ -127,12 +211,47 @@ def inventory_summary(df):
             "newest_car": None
         }
 
+    prices = ensure_parsed_price(df)
+    if POLARS_AVAILABLE:
+        try:
+            return _inventory_summary_polars(df, has_price=prices is not None)
+        except POLARS_FALLBACK_ERRORS:
+            pass
+
+    year_min, year_max, _, year_n = column_stats(df["Year"]) if "Year" in df else (None, None, 0, 0)
     return {
         "total_listings": len(df),
-        "avg_price": float(df["ParsedPrice"].mean()) if "ParsedPrice" in df else 0,
+        "avg_price": float(prices.mean()) if prices is not None else 0,
         "avg_mileage": float(df["Mileage"].mean()) if "Mileage" in df else 0,
-        "oldest_car": int(df["Year"].min()) if "Year" in df else None,
-        "newest_car": int(df["Year"].max()) if "Year" in df else None
+        "oldest_car": int(year_min) if year_n else None,
+        "newest_car": int(year_max) if year_n else None
+    }
+
+
+def _inventory_summary_polars(df, has_price):
+    """inventory_summary's stats as one Polars select over the needed columns."""
+    cols = [c for c in (("ParsedPrice",) if has_price else ()) + ("Mileage", "Year") if c in df.columns]
+    exprs = [pl.len().alias("total")]
+    if has_price:
+        exprs.append(pl.col("ParsedPrice").cast(pl.Float64, strict=False).mean().alias("avg_price"))
+    if "Mileage" in cols:
+        exprs.append(pl.col("Mileage").cast(pl.Float64, strict=False).mean().alias("avg_mileage"))
+    if "Year" in cols:
+        year = pl.col("Year").cast(pl.Float64, strict=False)
+        exprs += [year.min().alias("oldest"), year.max().alias("newest")]
+    row = pl.from_pandas(df[cols]).select(exprs).row(0, named=True)
+
+    def mean(name):
+        value = row.get(name)
+        return float("nan") if value is None else float(value)
+
+    oldest, newest = row.get("oldest"), row.get("newest")
+    return {
+        "total_listings": row["total"],
+        "avg_price": mean("avg_price") if has_price else 0,
+        "avg_mileage": mean("avg_mileage") if "Mileage" in cols else 0,
+        "oldest_car": int(oldest) if oldest is not None else None,
+        "newest_car": int(newest) if newest is not None else None
     }
 
 
@@ -159,9 +278,13 @@ def social_summary(df):
         "total_shares": int(df["Shares"].sum())
     }
 
-    # Top platform by views
-    platform_views = df.groupby("Platform")["Views"].sum().sort_values(ascending=False)
-    top_platform = platform_views.index[0] if len(platform_views) > 0 else None
+    # Top platform by views: only a handful of platforms, so sum with
+    # factorize + bincount rather than building a groupby
+    codes, platforms = pd.factorize(df["Platform"], sort=True)
+    valid = codes >= 0
+    views = df["Views"].to_numpy(dtype=float)
+    platform_views = np.bincount(codes[valid], weights=views[valid], minlength=len(platforms))
+    top_platform = platforms[platform_views.argmax()] if len(platforms) > 0 else None
 
     totals["top_platform"] = top_platform
 
@@ -176,8 +299,9 @@ def generate_insights(inv_df, soc_df):
 
     # --- Inventory insights ---
     if not inv_df.empty:
-        if "ParsedPrice" in inv_df.columns:
-            avg_price = inv_df["ParsedPrice"].mean()
+        prices = ensure_parsed_price(inv_df)
+        if prices is not None:
+            avg_price = prices.mean()
             if avg_price and avg_price > 20000:
                 insights.append("Your inventory skews toward higher-value vehicles — promote finance options.")
             elif avg_price < 8000:
@@ -197,6 +321,197 @@ def generate_insights(inv_df, soc_df):
     return insights
 
 
+# ---------------------------------------------------------
+# DASHBOARD AGGREGATES (Pro + Platinum charts)
+# ---------------------------------------------------------
+
+def _dashboard_aggregates_polars(df):
+    pdf = pl.from_pandas(df[["Make", "Model", "Platform", "Date", "Price", "Revenue", "Reach", "Impressions"]])
+    by_make = (pdf.group_by("Make")
+               .agg(pl.len().alias("Count"), pl.col("Price").mean().alias("Avg_Price"))
+               .sort("Make").to_pandas().set_index("Make"))
+    by_model = (pdf.group_by("Model")
+                .agg(pl.len().alias("Count"), pl.col("Revenue").sum())
+                .sort("Model").to_pandas().set_index("Model"))
+    revenue_by_date = pdf.group_by("Date").agg(pl.col("Revenue").sum()).sort("Date").to_pandas()
+    by_platform = (pdf.group_by("Platform")
+                   .agg(pl.col("Reach").sum(), pl.col("Impressions").sum(), pl.col("Revenue").sum())
+                   .sort("Platform").to_pandas().set_index("Platform"))
+    return by_make, by_model, revenue_by_date, by_platform
+
+
+def _dashboard_aggregates_pandas(df):
+    by_make = df.groupby("Make", observed=True).agg(Count=("Price", "size"), Avg_Price=("Price", "mean"))
+    by_model = df.groupby("Model", observed=True).agg(Count=("Revenue", "size"), Revenue=("Revenue", "sum"))
+    revenue_by_date = df.groupby("Date")["Revenue"].sum().reset_index()
+    by_platform = df.groupby("Platform", observed=True)[["Reach", "Impressions", "Revenue"]].sum()
+    return by_make, by_model, revenue_by_date, by_platform
+
+
+def dashboard_aggregates(df):
+    """
+    Every groupby behind the Pro/Platinum analytics charts, computed together.
+    Uses Polars when installed (one conversion shared by all aggregations),
+    otherwise pandas. Results are pandas objects:
+
+    by_make (Count, Avg_Price), by_model (Count, Revenue),
+    revenue_by_date (Date, Revenue), by_platform (Reach, Impressions, Revenue)
+    """
+    result = None
+    if POLARS_AVAILABLE:
+        try:
+            result = _dashboard_aggregates_polars(df)
+        except POLARS_FALLBACK_ERRORS:
+            result = None
+    if result is None:
+        result = _dashboard_aggregates_pandas(df)
+    return dict(zip(("by_make", "by_model", "revenue_by_date", "by_platform"), result))
+
+
+# ---------------------------------------------------------
+# PLATINUM RECOMMENDATIONS (RULES OVER REVENUE AGGREGATES)
+# ---------------------------------------------------------
+WEEKDAYS = ("Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday")
+
+
+def platinum_aggregates(df, keys=("Model", "Platform")):
+    """
+    Revenue totals per key column, derived from a single grouped pass over
+    all keys present in `df`. Returns {column: Series}.
+    """
+    keys = [k for k in keys if k in df.columns]
+    if df.empty or not keys or "Revenue" not in df.columns:
+        return {}
+    by_all = df.groupby(keys, observed=True)["Revenue"].sum()
+    return {k: by_all.groupby(level=k, observed=True).sum() for k in keys}
+
+
+def platinum_recommendations(df, aggs=None):
+    """
+    Rule-based recommendations for the Platinum dashboard. Pass `aggs`
+    (see platinum_aggregates) to reuse revenue totals the caller already has.
+    """
+    recs = []
+    if df is None or df.empty:
+        return recs
+
+    aggs = dict(aggs or {})
+    missing = [k for k in ("Model", "Platform") if k not in aggs]
+    if missing:
+        aggs.update(platinum_aggregates(df, missing))
+
+    model_rev = aggs.get("Model")
+    if model_rev is not None and len(model_rev):
+        recs.append(f"Your top-earning model is {model_rev.idxmax()} — feature it prominently in ads and social posts.")
+
+    platform_rev = aggs.get("Platform")
+    if platform_rev is not None and len(platform_rev):
+        best, worst = platform_rev.idxmax(), platform_rev.idxmin()
+        recs.append(f"{best} drives the most revenue — shift more of your posting budget there.")
+        if worst != best:
+            recs.append(f"{worst} is underperforming — test new content formats or reduce spend.")
+
+    if "Date" in df.columns and "Revenue" in df.columns:
+        # Sum revenue per integer weekday with bincount; no day-name strings per row
+        dates = pd.to_datetime(df["Date"], errors="coerce")
+        valid = dates.notna().to_numpy()
+        if valid.any():
+            dow = dates.dt.dayofweek.to_numpy()[valid].astype(np.intp)
+            revenue = pd.to_numeric(df["Revenue"], errors="coerce").to_numpy(dtype=np.float64, na_value=np.nan)[valid]
+            by_day = np.bincount(dow, weights=np.nan_to_num(revenue), minlength=7)
+            recs.append(f"{WEEKDAYS[by_day.argmax()]} is your strongest day for revenue — schedule key listings then.")
+
+    prices = ensure_parsed_price(df)
+    if prices is not None:
+        avg_price = prices.mean()
+        if pd.notna(avg_price) and avg_price > 30000:
+            recs.append("Average ticket price is high — promote finance and part-exchange offers.")
+
+    return recs
+
+
+# ---------------------------------------------------------
+# CLEANED-FRAME DISK CACHE (warm restarts)
+# ---------------------------------------------------------
+ANALYTICS_CACHE_DIR = os.environ.get("ANALYTICS_CACHE_DIR") or os.path.join(tempfile.gettempdir(), "dealercommand_analytics")
+ANALYTICS_CACHE_TTL = 60
+
+# Parquet only: loading a pickle runs whatever code the file holds, so without
+# pyarrow there is no disk cache at all
+try:
+    import pyarrow  # noqa: F401
+    FRAME_CACHE_ENABLED = True
+except ModuleNotFoundError:
+    FRAME_CACHE_ENABLED = False
+
+
+def _private_cache_dir():
+    """
+    ANALYTICS_CACHE_DIR, created 0o700 if missing. None unless it is a real
+    directory owned by this user with no group/other access.
+    """
+    try:
+        os.makedirs(ANALYTICS_CACHE_DIR, mode=0o700, exist_ok=True)
+        info = os.lstat(ANALYTICS_CACHE_DIR)
+    except OSError:
+        return None
+    if not stat.S_ISDIR(info.st_mode) or info.st_mode & 0o077:
+        return None
+    if hasattr(os, "getuid") and info.st_uid != os.getuid():
+        return None
+    return ANALYTICS_CACHE_DIR
+
+
+def _frame_cache_path(user_email, name):
+    """Cache file for this user's frame, or None when the disk cache is off or unsafe."""
+    if not FRAME_CACHE_ENABLED:
+        return None
+    cache_dir = _private_cache_dir()
+    if cache_dir is None:
+        return None
+    digest = hashlib.sha1(str(user_email).lower().encode()).hexdigest()
+    return os.path.join(cache_dir, f"{digest}_{name}.parquet")
+
+
+def _load_cached_frame(path):
+    """Returns the cached frame if it is younger than the TTL, else None."""
+    try:
+        if time.time() - os.path.getmtime(path) > ANALYTICS_CACHE_TTL:
+            return None
+        return pd.read_parquet(path, engine="pyarrow")
+    except Exception:
+        return None
+
+
+def _save_cached_frame(df, path):
+    """Writes via a temp file + rename so concurrent readers never see a partial file."""
+    try:
+        tmp = f"{path}.{os.getpid()}.tmp"
+        df.to_parquet(tmp, engine="pyarrow", compression="zstd")
+        os.replace(tmp, path)
+    except Exception as e:
+        print("analytics cache write failed:", e)
+
+
+def _cached_clean_frame(user_email, name, fetch, clean):
+    path = _frame_cache_path(user_email, name)
+    df = _load_cached_frame(path) if path else None
+    if df is None:
+        raw = fetch(user_email)
+        df = clean(raw)
+        # An empty fetch may be a failed read: use it now, but don't persist it
+        if path and raw is not None and len(raw):
+            _save_cached_frame(df, path)
+    return df
+
+
+def load_social_frame(user_email):
+    """Cleaned social-media rows for `user_email`, served from the disk cache when fresh."""
+    return _cached_clean_frame(
+        user_email, "social", lambda email: get_social_media_data(email=email), clean_social
+    )
+
+
 # ---------------------------------------------------------
 # MAIN ANALYTICS ENTRYPOINT (Option C)
 # ---------------------------------------------------------
@@ -217,11 +532,8 @@ def analytics_dashboard(user_email):
     """
 
     # ------------------ Load data ------------------
-    raw_inv = get_inventory_for_user(user_email)
-    raw_social = get_social_media_data(user_email)
-
-    inv_df = clean_inventory(raw_inv)
-    soc_df = clean_social(raw_social)
+    inv_df = _cached_clean_frame(user_email, "inventory", get_inventory_for_user, clean_inventory)
+    soc_df = load_social_frame(user_email)
 
     # ------------------ Summaries ------------------
     summary = {
@@ -242,14 +554,18 @@ def generate_demo_data():
     """Returns fake datasets to allow analytics to run even without Google Sheets."""
     dates = pd.date_range(datetime.today() - timedelta(days=14), periods=14)
 
+    # One draw for all metric columns: [Views, Likes, Comments, Shares, Reach]
+    rng = np.random.default_rng()
+    metrics = rng.integers([1000, 10, 0, 0, 1000], [10000, 500, 50, 30, 20000], size=(14, 5))
+
     social_demo = pd.DataFrame({
         "Date": dates,
         "Platform": ["TikTok", "Instagram"] * 7,
-        "Views": np.random.randint(1000, 10000, size=14),
-        "Likes": np.random.randint(10, 500, size=14),
-        "Comments": np.random.randint(0, 50, size=14),
-        "Shares": np.random.randint(0, 30, size=14),
-        "Reach": np.random.randint(1000, 20000, size=14)
+        "Views": metrics[:, 0],
+        "Likes": metrics[:, 1],
+        "Comments": metrics[:, 2],
+        "Shares": metrics[:, 3],
+        "Reach": metrics[:, 4]
     })
 
     inv_demo = pd.DataFrame({
@@ -2,18 +2,53 @@
 import os
 import json
 import uuid
+import time
+import queue
+import atexit
+import threading
+from collections import OrderedDict
 from datetime import datetime
 from flask import Flask, request, jsonify
-from sheet_utils import (
-    append_to_google_sheet,
-    upsert_to_sheet,
-    get_sheet_data
-)
+# One canonical sheet layer: the package import shares its read cache with
+# the rest of backend; the flat import is only for running from backend/
+try:
+    from backend.sheet_utils import (
+        append_rows_to_google_sheet,
+        upsert_to_sheet,
+        get_sheet_data,
+        get_rows_for_email,
+        frame_records
+    )
+except ModuleNotFoundError:
+    from sheet_utils import (
+        append_rows_to_google_sheet,
+        upsert_to_sheet,
+        get_sheet_data,
+        get_rows_for_email,
+        frame_records
+    )
+
+try:
+    import orjson
+    _json_loads = orjson.loads
+
+    def _json_dumps(obj):
+        return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS).decode()
+except ModuleNotFoundError:
+    _json_loads = json.loads
+    _json_dumps = json.dumps
 
 app = Flask(__name__)
 
 # Environment
 SPREADSHEET_NAME = os.environ.get("SPREADSHEET_NAME", "DealerCommand_DB")
+RECORD_META_COLUMNS = ["ID", "Email", "Record_Type", "Created_At", "Updated_At"]
+WRITE_BATCH_SIZE = 100
+WRITE_FLUSH_INTERVAL = 0.2  # seconds a batch waits to fill before it is sent
+WRITE_MAX_ATTEMPTS = 3  # tries per batch before its records are reported failed
+WRITE_RETRY_DELAY = 1.0  # seconds, doubled after each failed try
+WRITE_DRAIN_TIMEOUT = 30  # seconds shutdown waits for the writer to finish
+WRITE_STATUS_MAXSIZE = 10000  # record IDs whose write outcome is remembered
 
 # -------------------------
 # Helper functions
@@ -24,42 +59,161 @@ def generate_id():
 def now_iso():
     return datetime.utcnow().isoformat()
 
-def save_record(email, record_type, data_dict, record_id=None):
-    """Upsert a record in the unified DB."""
-    payload = {
+def build_record(email, record_type, data_dict, record_id=None):
+    return {
         "ID": record_id or generate_id(),
         "Email": email.lower(),
         "Record_Type": record_type,
-        "Data_JSON": json.dumps(data_dict),
+        "Data_JSON": _json_dumps(data_dict),
         "Created_At": now_iso(),
         "Updated_At": now_iso()
     }
+
+def save_record(email, record_type, data_dict, record_id=None):
+    """Upsert a record in the unified DB."""
     return upsert_to_sheet(
         sheet_name=SPREADSHEET_NAME,
         key_col="ID",
-        data_dict=payload
+        data_dict=build_record(email, record_type, data_dict, record_id)
     )
 
-def get_records(email=None, record_type=None):
-    df = get_sheet_data(SPREADSHEET_NAME)
-    if df.empty:
-        return []
+# -------------------------
+# Background writer (append-only records)
+# -------------------------
+_write_queue = queue.Queue()
+_STOP = object()  # queued by _drain_writes: flush everything, then exit
+_write_lock = threading.Lock()
+_unwritten = OrderedDict()  # ID -> queued record not yet in the sheet (read-your-writes)
+_write_status = OrderedDict()  # ID -> "pending" / "written" / "failed"
+
+def _set_write_status(batch, status):
+    with _write_lock:
+        for record in batch:
+            _unwritten.pop(record["ID"], None)
+            _write_status[record["ID"]] = status
+            _write_status.move_to_end(record["ID"])
+        while len(_write_status) > WRITE_STATUS_MAXSIZE:
+            _write_status.popitem(last=False)
+
+def _flush_writes(batch):
+    """
+    Appends a batch, retrying with backoff, and records each record's
+    outcome. Queued records always carry a fresh ID, so they are appended
+    directly (the whole batch in one request) rather than through
+    upsert_to_sheet's read-then-write.
+    """
+    if not batch:
+        return
+    delay = WRITE_RETRY_DELAY
+    for attempt in range(1, WRITE_MAX_ATTEMPTS + 1):
+        try:
+            if append_rows_to_google_sheet(SPREADSHEET_NAME, batch):
+                _set_write_status(batch, "written")
+                return
+            print(f"background write failed for batch of {len(batch)} (attempt {attempt})")
+        except Exception as e:
+            print(f"background write error (attempt {attempt}):", e)
+        if attempt < WRITE_MAX_ATTEMPTS:
+            time.sleep(delay)
+            delay *= 2
+    _set_write_status(batch, "failed")
+
+def _take_queued():
+    """Everything currently queued (skipping stop markers), without blocking."""
+    items = []
+    while True:
+        try:
+            item = _write_queue.get_nowait()
+        except queue.Empty:
+            return items
+        if item is not _STOP:
+            items.append(item)
+
+def _write_worker():
+    stopping = False
+    while not stopping:
+        item = _write_queue.get()
+        stopping = item is _STOP
+        batch = [] if stopping else [item]
+        deadline = time.monotonic() + WRITE_FLUSH_INTERVAL
+        while not stopping and len(batch) < WRITE_BATCH_SIZE:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = _write_queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            stopping = item is _STOP
+            if not stopping:
+                batch.append(item)
+        if stopping:
+            # Shutting down: the batch in hand plus everything queued behind it
+            batch += _take_queued()
+        for start in range(0, len(batch), WRITE_BATCH_SIZE):
+            _flush_writes(batch[start:start + WRITE_BATCH_SIZE])
+
+def _drain_writes():
+    """At exit, lets the writer flush its current batch and the queue, then waits for it."""
+    _write_queue.put(_STOP)
+    _writer.join(WRITE_DRAIN_TIMEOUT)
+    if _writer.is_alive():
+        print("background writer still busy at exit;", _write_queue.qsize(), "records queued")
+
+def queue_record(email, record_type, data_dict):
+    """
+    Builds a new record and hands it to the background writer, returning its
+    ID immediately; the write is pending until the writer confirms it (see
+    write_status). For append-only logs (activity, usage, metrics); get_records
+    includes records still waiting to be written.
+    """
+    record = build_record(email, record_type, data_dict)
+    with _write_lock:
+        _unwritten[record["ID"]] = record
+        _write_status[record["ID"]] = "pending"
+    _write_queue.put(record)
+    return record["ID"]
+
+def write_status(record_id):
+    """Outcome of a queued record: "pending", "written" or "failed" (None if unknown)."""
+    with _write_lock:
+        return _write_status.get(record_id)
+
+def _unwritten_records(email=None, record_type=None):
+    with _write_lock:
+        pending = list(_unwritten.values())
     if email:
-        df = df[df["Email"].astype(str).str.lower() == email.lower()]
+        pending = [r for r in pending if r["Email"] == email.lower()]
     if record_type:
-        df = df[df["Record_Type"].astype(str) == record_type]
-    # parse Data_JSON
+        pending = [r for r in pending if r["Record_Type"] == record_type]
+    return pending
+
+def _accepted(record_id):
+    """Response for a queued write: accepted, not yet confirmed."""
+    return jsonify({"accepted": True, "status": "pending", "id": record_id}), 202
+
+_writer = threading.Thread(target=_write_worker, name="sheet-writer", daemon=True)
+_writer.start()
+atexit.register(_drain_writes)
+
+def get_records(email=None, record_type=None):
+    df = get_rows_for_email(SPREADSHEET_NAME, email) if email else get_sheet_data(SPREADSHEET_NAME)
     records = []
-    for _, row in df.iterrows():
-        data = json.loads(row.get("Data_JSON") or "{}")
-        data.update({
-            "ID": row["ID"],
-            "Email": row["Email"],
-            "Record_Type": row["Record_Type"],
-            "Created_At": row["Created_At"],
-            "Updated_At": row["Updated_At"]
-        })
-        records.append(data)
+    if not df.empty:
+        if record_type:
+            df = df[df["Record_Type"].astype(str) == record_type]
+        # parse Data_JSON, then overlay the record metadata
+        records = [_json_loads(raw or "{}") for raw in df["Data_JSON"].to_numpy()]
+        meta = frame_records(df[RECORD_META_COLUMNS])
+        for data, row_meta in zip(records, meta):
+            data.update(row_meta)
+    # Queued writes not in the sheet yet, so a POST is visible to the next GET
+    seen = {r.get("ID") for r in records}
+    for pending in _unwritten_records(email, record_type):
+        if pending["ID"] not in seen:
+            data = _json_loads(pending["Data_JSON"])
+            data.update({col: pending[col] for col in RECORD_META_COLUMNS})
+            records.append(data)
     return records
 
 # -------------------------
@@ -71,6 +225,14 @@ def get_records(email=None, record_type=None):
 def ping():
     return jsonify({"success": True, "message": "DealerCommand API is alive"}), 200
 
+# Outcome of a queued (202 Accepted) write
+@app.route("/writes/<record_id>", methods=["GET"])
+def queued_write_status(record_id):
+    status = write_status(record_id)
+    if status is None:
+        return jsonify({"success": False, "error": "Unknown record"}), 404
+    return jsonify({"success": True, "id": record_id, "status": status})
+
 # -------------------------
 # Dealership Profile
 # -------------------------
@@ -122,8 +284,8 @@ def user_activity():
         return jsonify({"success": False, "error": "Missing email or action"}), 400
 
     record = {"Action": action, "Details": details, "Timestamp": now_iso()}
-    success = save_record(email=email, record_type="User_Activity", data_dict=record)
-    return jsonify({"success": success})
+    record_id = queue_record(email=email, record_type="User_Activity", data_dict=record)
+    return _accepted(record_id)
 
 # -------------------------
 # Trial Usage
@@ -134,8 +296,8 @@ def trial_usage():
     usage_count = request.json.get("usage_count", 1)
     last_used = now_iso()
     record = {"Usage_Count": usage_count, "Last_Used": last_used}
-    success = save_record(email=email, record_type="Trial_Usage", data_dict=record)
-    return jsonify({"success": success})
+    record_id = queue_record(email=email, record_type="Trial_Usage", data_dict=record)
+    return _accepted(record_id)
 
 # -------------------------
 # Platinum Usage
@@ -150,8 +312,8 @@ def platinum_usage():
         "Dashboard_Exported": data.get("Dashboard_Exported", 0),
         "Last_Reset": now_iso()
     }
-    success = save_record(email=email, record_type="Platinum_Usage", data_dict=record)
-    return jsonify({"success": success})
+    record_id = queue_record(email=email, record_type="Platinum_Usage", data_dict=record)
+    return _accepted(record_id)
 
 # -------------------------
 # Social Media
@@ -162,8 +324,8 @@ def social_media():
 
     if request.method == "POST":
         data = request.json.get("social", {})
-        success = save_record(email=email, record_type="Social_Media", data_dict=data)
-        return jsonify({"success": success})
+        record_id = queue_record(email=email, record_type="Social_Media", data_dict=data)
+        return _accepted(record_id)
 
     # GET
     posts = get_records(email=email, record_type="Social_Media")
@@ -179,8 +341,8 @@ def custom_report():
     if not email or not report_data:
         return jsonify({"success": False, "error": "Missing email or report"}), 400
 
-    success = save_record(email=email, record_type="Custom_Report", data_dict=report_data)
-    return jsonify({"success": success})
+    record_id = queue_record(email=email, record_type="Custom_Report", data_dict=report_data)
+    return _accepted(record_id)
 
 # -------------------------
 # AI Scripts
@@ -192,8 +354,8 @@ def ai_script():
     if not email or not script_data:
         return jsonify({"success": False, "error": "Missing email or script"}), 400
 
-    success = save_record(email=email, record_type="AI_Script", data_dict=script_data)
-    return jsonify({"success": success})
+    record_id = queue_record(email=email, record_type="AI_Script", data_dict=script_data)
+    return _accepted(record_id)
 
 # -------------------------
 # Performance / Metrics
@@ -205,11 +367,19 @@ def performance():
     if not email or not metric_data:
         return jsonify({"success": False, "error": "Missing email or metric"}), 400
 
-    success = save_record(email=email, record_type="Performance", data_dict=metric_data)
-    return jsonify({"success": success})
+    record_id = queue_record(email=email, record_type="Performance", data_dict=metric_data)
+    return _accepted(record_id)
 
 # -------------------------
 # Run Flask
 # -------------------------
+# Every route blocks on the Apps Script backend, so requests must be served
+# concurrently. In production run under a threaded WSGI server, e.g.:
+#   gunicorn -w 2 --threads 16 -b 0.0.0.0:$PORT app:app
 if __name__ == "__main__":
-    app.run(debug=True, host="0.0.0.0", port=int(os.environ.get("PORT", 5000)))
+    app.run(
+        debug=os.environ.get("FLASK_DEBUG", "0") == "1",
+        threaded=True,
+        host="0.0.0.0",
+        port=int(os.environ.get("PORT", 5000))
+    )
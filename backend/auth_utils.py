@@ -1,10 +1,33 @@
 # backend/auth_utils.py
+import os
 import bcrypt
 
+try:
+    from argon2 import PasswordHasher
+    from argon2.exceptions import VerificationError, InvalidHashError
+    ARGON2_AVAILABLE = True
+except ModuleNotFoundError:
+    ARGON2_AVAILABLE = False
+
+# Explicit bcrypt work factor (used when argon2-cffi isn't installed); tune per server.
+BCRYPT_ROUNDS = int(os.environ.get("BCRYPT_ROUNDS", "12"))
+
+# Argon2id, OWASP baseline parameters (19 MiB, t=2, p=1)
+_password_hasher = PasswordHasher(time_cost=2, memory_cost=19456, parallelism=1) if ARGON2_AVAILABLE else None
+
 def hash_password(password: str) -> str:
-    """Hash a plain password string."""
-    return bcrypt.hashpw(password.encode(), bcrypt.gensalt()).decode()
+    """Hash a plain password string (Argon2id when available, else bcrypt)."""
+    if _password_hasher is not None:
+        return _password_hasher.hash(password)
+    return bcrypt.hashpw(password.encode(), bcrypt.gensalt(rounds=BCRYPT_ROUNDS)).decode()
 
 def verify_password(password: str, stored_hash: str) -> bool:
-    """Verify a plain password against the stored hash."""
+    """Verify a plain password against the stored hash (Argon2id or legacy bcrypt)."""
+    if stored_hash.startswith("$argon2"):
+        if _password_hasher is None:
+            return False
+        try:
+            return _password_hasher.verify(stored_hash, password)
+        except (VerificationError, InvalidHashError):
+            return False
     return bcrypt.checkpw(password.encode(), stored_hash.encode())
@@ -0,0 +1,6 @@
+# backend/constants.py
+# Plan limits shared by trial_manager and its callers, importable without
+# pulling in the sheet layer.
+
+TRIAL_DAYS = 30
+MAX_FREE_LISTINGS = 15  # Free trial limit
@@ -1,39 +1,25 @@
 # backend/inventory_manager.py
 
-from backend.sheet_utils import api_get, api_post, get_sheet_data, append_to_google_sheet
+# One inventory store: sheet_utils' "Inventory" sheet
+from backend.sheet_utils import save_inventory_item
+from backend.sheet_utils import delete_inventory_item as _delete_item
+from backend.sheet_utils import get_inventory_for_user as _inventory_frame, frame_records
 from backend.sheet_utils import get_dealership_profile, save_dealership_profile
 
-INV_API = "inventory"
-
-def save_inventory_item(data_dict):
-    """
-    Saves a listing to Google Sheets.
-    """
-    return append_to_google_sheet("Listings", data_dict)
-
 def get_inventory_for_user(email):
     """
-    Retrieves all inventory items for a specific user from the Listings sheet.
+    Retrieves the user's inventory items (as dicts) from the Inventory sheet,
+    where save_inventory_item writes them. Deleted items are left out.
     """
-    df = get_sheet_data("Listings")
-    if df is None or df.empty:
-        return []
+    df = _inventory_frame(email)
     df.columns = [str(c).strip() for c in df.columns]
-    email_col = next((c for c in df.columns if c.lower() == "email"), None)
-    if not email_col:
-        return []
-    df[email_col] = df[email_col].astype(str).str.lower()
-    return df[df[email_col] == email.lower()].to_dict(orient="records")
+    return frame_records(df)
 
 def delete_inventory_item(email, listing_id):
     """
     Deletes a listing by email and listing id.
     """
-    return api_post(INV_API, {
-        "action": "delete",
-        "email": email,
-        "id": listing_id
-    })
+    return _delete_item(listing_id, email=email)
 
 # ---- Dealership profile helper ----
 def login_user(email):
@@ -1,5 +1,6 @@
 # migrate_old_sheets.py
 import os
+from concurrent.futures import ThreadPoolExecutor
 from backend.sheet_utils import migrate_sheet_tab
 
 # Ensure APPS_SCRIPT_URL env is set before running
@@ -16,6 +17,9 @@ tabs_to_migrate = [
 ]
 
 if __name__ == "__main__":
-    for tab, email_field in tabs_to_migrate:
-        ok, msg = migrate_sheet_tab(tab, email_field)
-        print(f"{tab}: {ok} - {msg}")
+    # Tabs are independent network-bound migrations: run them side by side,
+    # report in list order
+    with ThreadPoolExecutor(max_workers=len(tabs_to_migrate)) as ex:
+        results = ex.map(lambda t: migrate_sheet_tab(*t), tabs_to_migrate)
+        for (tab, _), (ok, msg) in zip(tabs_to_migrate, results):
+            print(f"{tab}: {ok} - {msg}")
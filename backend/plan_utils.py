@@ -1,4 +1,15 @@
 # backend/plan_utils.py
+
+# Permission matrix, built once at import: plan -> frozenset of features
+FEATURE_MATRIX = {
+    "free": frozenset(),
+    "premium": frozenset(),
+    "pro": frozenset({"analytics.pro", "compare.cars"}),
+    "platinum": frozenset({"analytics.pro", "analytics.platinum", "compare.cars", "ai.video_script"})
+}
+_NO_FEATURES = frozenset()
+_TRIAL_FEATURES = FEATURE_MATRIX["platinum"]
+
 def has_feature(plan, feature, trial_active=False):
     """
     Simple permission matrix.
@@ -6,13 +17,6 @@ def has_feature(plan, feature, trial_active=False):
     feature: 'analytics.pro' or 'analytics.platinum' etc
     trial_active: bool - if trial active, treat user as platinum
     """
-    plan = (plan or "free").lower()
     if trial_active:
-        plan = "platinum"
-    matrix = {
-        "free": [],
-        "premium": [],
-        "pro": ["analytics.pro", "compare.cars"],
-        "platinum": ["analytics.pro","analytics.platinum","compare.cars", "ai.video_script"]
-    }
-    return feature in matrix.get(plan, [])
+        return feature in _TRIAL_FEATURES
+    return feature in FEATURE_MATRIX.get((plan or "free").lower(), _NO_FEATURES)
@@ -3,27 +3,44 @@ import numpy as np
 from datetime import datetime, timedelta
 from backend.sheet_utils import (
     get_inventory_for_user,
-    get_social_media_data,
     get_sheet_data,
-    append_to_google_sheet
+    append_to_google_sheet,
+    frame_records
 )
-from openai import OpenAI
+from backend.analytics import load_social_frame
+from backend.trial_manager import get_dealership_status, increment_usage
+from openai import OpenAI, AsyncOpenAI
 import os
 import json
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 import random
 import uuid
 
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ModuleNotFoundError:
+    NUMBA_AVAILABLE = False
+
 # ----------------------
 # AI CLIENT
 # ----------------------
 API_KEY = os.environ.get("OPENAI_API_KEY")
-ai_client = OpenAI(api_key=API_KEY) if API_KEY else None
+MAX_CONCURRENT_SCRIPTS = 10
+_ai_client = None
+
+def get_ai_client():
+    """Lazily builds one OpenAI client and reuses it (and its connection pool) for every call."""
+    global _ai_client
+    if _ai_client is None and API_KEY:
+        _ai_client = OpenAI(api_key=API_KEY)
+    return _ai_client
 
 # ----------------------
 # PLATINUM CHECK
 # ----------------------
 def is_platinum(email):
-    from backend.trial_manager import get_dealership_status
     plan = get_dealership_status(email).get("Plan", "").lower()
     return plan == "platinum"
 
@@ -31,142 +48,318 @@ def is_platinum(email):
 # LISTING USAGE
 # ----------------------
 def can_add_listing(email):
-    from backend.trial_manager import get_dealership_status
+    # One status lookup serves both checks
     status = get_dealership_status(email)
     remaining = status.get("Remaining_Listings", 0)
-    return remaining > 0 or is_platinum(email)
+    return remaining > 0 or status.get("Plan", "").lower() == "platinum"
 
 def increment_platinum_usage(email, count=1):
-    from backend.trial_manager import increment_usage
     # Renamed from decrement_listing_count to increment_usage for clarity and consistency with trial_manager
     increment_usage(email, count) 
 
 # ----------------------
 # DEMO DATA GENERATOR
 # ----------------------
-def generate_demo_inventory(top_n=5):
-    # Fixed dependency: numpy is not used here, replacing with random
-    random.seed(42)
+def _demo_inventory_columns(top_n=5):
+    # Columns sampled as whole arrays; local generator leaves global RNG state alone
+    rng = np.random.default_rng(42)
     makes = ["BMW", "Audi", "Mercedes", "Toyota", "Land Rover"]
     models = ["X5", "A3", "C-Class", "Corolla", "Discovery"]
     colors = ["Red", "Blue", "Black", "White"]
-    demo_listings = []
-    for i in range(top_n):
-        demo_listings.append({
-            "Make": random.choice(makes),
-            "Model": random.choice(models),
-            "Year": random.randint(2015, 2024),
-            "Mileage": random.randint(5000, 80000),
-            "Color": random.choice(colors),
-            "Fuel": random.choice(["Petrol","Diesel","Hybrid"]),
-            "Transmission": random.choice(["Manual","Automatic"]),
-            "Price": f"£{random.randint(20000,50000)}",
-            "Features": "Panoramic roof, heated seats, M Sport package",
-            "Notes": "Full service history, finance available",
-            "Timestamp": datetime.utcnow().isoformat(), # Use ISO format for consistency
-            "Inventory_ID": str(uuid.uuid4())
-        })
-    return pd.DataFrame(demo_listings)
+    timestamp = datetime.utcnow().isoformat()  # Use ISO format for consistency
+    return {
+        "Make": rng.choice(makes, size=top_n).tolist(),
+        "Model": rng.choice(models, size=top_n).tolist(),
+        "Year": rng.integers(2015, 2025, size=top_n).tolist(),
+        "Mileage": rng.integers(5000, 80001, size=top_n).tolist(),
+        "Color": rng.choice(colors, size=top_n).tolist(),
+        "Fuel": rng.choice(["Petrol","Diesel","Hybrid"], size=top_n).tolist(),
+        "Transmission": rng.choice(["Manual","Automatic"], size=top_n).tolist(),
+        "Price": ["£" + str(p) for p in rng.integers(20000, 50001, size=top_n).tolist()],
+        "Features": ["Panoramic roof, heated seats, M Sport package"] * top_n,
+        "Notes": ["Full service history, finance available"] * top_n,
+        "Timestamp": [timestamp] * top_n,
+        "Inventory_ID": [str(uuid.uuid4()) for _ in range(top_n)]
+    }
 
-def generate_demo_social_data():
-    random.seed(42)
+def _demo_social_columns():
+    # Same draws as seeding the global RNG with 42, without touching its state
+    rng = random.Random(42)
     platforms = ["Instagram","TikTok","Facebook"]
-    return pd.DataFrame({
-        "Platform": random.choices(platforms, k=5),
-        "Revenue": [random.randint(100, 1000) for _ in range(5)],
-        "Reach": [random.randint(1000, 10000) for _ in range(5)],
-        "Impressions": [random.randint(5000, 20000) for _ in range(5)]
-    })
+    return {
+        "Platform": rng.choices(platforms, k=5),
+        "Revenue": [rng.randint(100, 1000) for _ in range(5)],
+        "Reach": [rng.randint(1000, 10000) for _ in range(5)],
+        "Impressions": [rng.randint(5000, 20000) for _ in range(5)]
+    }
+
+# Fixed seed, so the demo social data never changes: build it once
+_DEMO_SOCIAL_COLUMNS = _demo_social_columns()
+_DEMO_SOCIAL_DF = pd.DataFrame(_DEMO_SOCIAL_COLUMNS)
+
+def _column_records(columns):
+    """Dict of equal-length lists -> list of row dicts, without a DataFrame."""
+    names = list(columns)
+    return [dict(zip(names, row)) for row in zip(*columns.values())]
+
+def generate_demo_inventory(top_n=5):
+    return pd.DataFrame(_demo_inventory_columns(top_n))
+
+def generate_demo_social_data():
+    return _DEMO_SOCIAL_DF.copy()
 
 # ----------------------
 # TOP RECOMMENDATIONS
 # ----------------------
-def get_platinum_top_recommendations(email, top_n=5, demo_mode=False):
+def get_platinum_top_recommendations(email, top_n=5, demo_mode=False, inventory_df=None):
+    """Pass `inventory_df` to reuse an inventory frame the caller already fetched."""
     if demo_mode:
-        return generate_demo_inventory(top_n).to_dict(orient="records")
+        return _column_records(_demo_inventory_columns(top_n))
+
+    df = get_inventory_for_user(email) if inventory_df is None else inventory_df
+    return _top_recommendations_from_df(df, top_n)
+
+def _top_k_py(prices, ts, k):
+    """
+    Positions of the k best rows by (price desc, timestamp desc), ties kept
+    in row order -- the same ranking as DataFrame.nlargest. One pass with a
+    small insertion-sorted buffer; NaT (int64 min) ranks last.
+    """
+    n = len(prices)
+    k = max(min(k, n), 0)
+    idx = np.empty(k, dtype=np.int64)
+    filled = 0
+    for i in range(n):
+        p = prices[i]
+        t = ts[i]
+        pos = filled
+        while pos > 0:
+            j = idx[pos - 1]
+            if prices[j] > p or (prices[j] == p and ts[j] >= t):
+                break
+            pos -= 1
+        if pos >= k:
+            continue
+        end = filled if filled < k else k - 1
+        for m in range(end, pos, -1):
+            idx[m] = idx[m - 1]
+        idx[pos] = i
+        if filled < k:
+            filled += 1
+    return idx[:filled]
+
+if NUMBA_AVAILABLE:
+    _top_k = njit(cache=True)(_top_k_py)
 
-    df = get_inventory_for_user(email)
+def _top_recommendations_from_df(df, top_n):
     if df.empty:
         return []
 
-    df = df.copy()
-    df["Price_Num"] = pd.to_numeric(
-        df.get("Price", 0).astype(str).str.replace("£","").str.replace(",",""),
-        errors="coerce"
-    ).fillna(0)
-    df["Timestamp"] = pd.to_datetime(df.get("Timestamp", datetime.utcnow()), errors="coerce")
-    df = df.sort_values(["Price_Num", "Timestamp"], ascending=[False, False])
-    top_df = df.head(top_n)
-    return top_df.to_dict(orient="records")
+    # One regex pass strips both "£" and "," (a missing column ranks as 0)
+    prices = df["Price"].astype(str) if "Price" in df.columns else pd.Series("0", index=df.index)
+    price_num = pd.to_numeric(prices.str.replace(r"[£,]", "", regex=True), errors="coerce").fillna(0)
+    timestamps = pd.to_datetime(df.get("Timestamp", datetime.utcnow()), errors="coerce")
+    if NUMBA_AVAILABLE and isinstance(timestamps, pd.Series) and pd.api.types.is_datetime64_any_dtype(timestamps):
+        # Compiled single-pass top-k over the raw price / epoch arrays
+        top_pos = _top_k(price_num.to_numpy(dtype=np.float64), timestamps.array.asi8, top_n)
+        top_df = df.iloc[top_pos].assign(
+            Price_Num=price_num.array[top_pos],
+            Timestamp=timestamps.array[top_pos]
+        )
+        return frame_records(top_df)
+
+    # Rank on a two-column key frame (partial selection, not a full sort) and
+    # only materialise the winning rows; the inventory itself isn't copied
+    keys = pd.DataFrame({"Price_Num": price_num, "Timestamp": timestamps}).reset_index(drop=True)
+    top_keys = keys.nlargest(top_n, ["Price_Num", "Timestamp"])
+    top_df = df.iloc[top_keys.index.to_numpy()].assign(
+        Price_Num=top_keys["Price_Num"].array,
+        Timestamp=top_keys["Timestamp"].array
+    )
+    return frame_records(top_df)
 
 def get_platinum_remaining_listings(email):
-    from backend.trial_manager import get_dealership_status
     return get_dealership_status(email).get("Remaining_Listings", 0)
 
 # ----------------------
 # DASHBOARD
 # ----------------------
 def get_platinum_dashboard(email, demo_mode=False):
-    inventory_df = generate_demo_inventory() if demo_mode else get_inventory_for_user(email)
-    social_df = generate_demo_social_data() if demo_mode else get_social_media_data(email)
+    if demo_mode:
+        # A handful of demo rows: plain records, no DataFrame round trip
+        inventory = _column_records(_demo_inventory_columns())
+        inventory_count, top_recommendations = len(inventory), inventory
+        social_data = _column_records(_DEMO_SOCIAL_COLUMNS)
+        remaining_listings = get_platinum_remaining_listings(email)
+    else:
+        # The three sheet reads are independent: overlap their round trips
+        with ThreadPoolExecutor(max_workers=3) as ex:
+            inventory_future = ex.submit(get_inventory_for_user, email)
+            social_future = ex.submit(load_social_frame, email)
+            remaining_future = ex.submit(get_platinum_remaining_listings, email)
+            # Fetched once; the count and the top recommendations share this frame
+            inventory_df = inventory_future.result()
+            inventory_count = len(inventory_df)
+            top_recommendations = get_platinum_top_recommendations(email, inventory_df=inventory_df)
+            social_data = frame_records(social_future.result())
+            remaining_listings = remaining_future.result()
 
     return {
         "Profile": {
             "Email": email,
             "Plan": "Platinum"
         },
-        "Inventory_Count": len(inventory_df),
-        "Remaining_Listings": get_platinum_remaining_listings(email),
-        "Top_Recommendations": get_platinum_top_recommendations(email, demo_mode=demo_mode),
-        "Social_Data": social_df.to_dict(orient="records")
+        "Inventory_Count": inventory_count,
+        "Remaining_Listings": remaining_listings,
+        "Top_Recommendations": top_recommendations,
+        "Social_Data": social_data
     }
 
 # ----------------------
 # AI VIDEO SCRIPT GENERATOR
 # ----------------------
-def generate_ai_video_script(email, listing_data):
+_VIDEO_SCRIPT_FIELDS = """Make: {Make}
+Model: {Model}
+Year: {Year}
+Mileage: {Mileage}
+Color: {Color}
+Fuel: {Fuel}
+Transmission: {Transmission}
+Price: {Price}
+Features: {Features}
+Dealer Notes: {Notes}"""
+_VIDEO_SCRIPT_STYLE = "Write in an engaging, friendly, and persuasive tone for social media. Include emojis and call-to-actions."
+
+_VIDEO_SCRIPT_PROMPT = (
+    "\nYou are a professional automotive copywriter. Create a 90–120 second AI video script for the following car listing:\n\n"
+    + _VIDEO_SCRIPT_FIELDS + "\n\n" + _VIDEO_SCRIPT_STYLE + "\n"
+).format_map
+_listing_fields = _VIDEO_SCRIPT_FIELDS.format_map
+_SCRIPT_SYSTEM_MESSAGE = {"role":"system","content":"You are a top-tier automotive copywriter."}
+
+SCRIPT_BATCH_SIZE = 5
+_BATCH_SCRIPT_PROMPT = (
+    "You are a professional automotive copywriter. Create a 90–120 second AI video script for each of the "
+    "following {count} car listings:\n\n{cars}\n\n" + _VIDEO_SCRIPT_STYLE + "\n"
+    "Return JSON of the form {{\"scripts\": [\"...\", ...]}} containing exactly {count} scripts, "
+    "one per car, in the same order as the cars above."
+).format
+
+class _ListingFields:
+    """Read-only view for format_map: missing fields render as "None" without copying the listing."""
+    __slots__ = ("data",)
+
+    def __init__(self, data):
+        self.data = data
+
+    def __getitem__(self, key):
+        return self.data.get(key)
+
+def _fallback_video_script(listing_data):
     make = listing_data.get('Make', 'Luxury Vehicle')
     model = listing_data.get('Model', 'Performance Sedan')
     features = listing_data.get('Features', 'premium sound, advanced driver assistance')
-    
-    if not ai_client:
-        # Safe fallback if API key is missing
-        return f"""
+    return f"""
 [SCENE: OPENING SHOT]
 **VISUAL:** Dynamic shot of {make} {model}.
 **AUDIO:** Energetic music.
 **VOICEOVER:** Experience the thrill! This {model} is loaded with {features}. Contact us now!
 """
 
-    prompt = f"""
-You are a professional automotive copywriter. Create a 90–120 second AI video script for the following car listing:
-
-Make: {listing_data.get('Make')}
-Model: {listing_data.get('Model')}
-Year: {listing_data.get('Year')}
-Mileage: {listing_data.get('Mileage')}
-Color: {listing_data.get('Color')}
-Fuel: {listing_data.get('Fuel')}
-Transmission: {listing_data.get('Transmission')}
-Price: {listing_data.get('Price')}
-Features: {listing_data.get('Features')}
-Dealer Notes: {listing_data.get('Notes')}
-
-Write in an engaging, friendly, and persuasive tone for social media. Include emojis and call-to-actions.
-"""
+def _video_script_messages(listing_data):
+    return [_SCRIPT_SYSTEM_MESSAGE, {"role":"user","content":_VIDEO_SCRIPT_PROMPT(_ListingFields(listing_data))}]
+
+def _script_text(response):
+    return response.choices[0].message.content.strip() if response and getattr(response, "choices", None) else ""
+
+def _script_error(e):
+    return f"⚠️ Error generating script: {e}\n\n[Fallback: Contact DealerCommand today to book a test drive!]"
+
+def generate_ai_video_script(email, listing_data):
+    ai_client = get_ai_client()
+    if not ai_client:
+        # Safe fallback if API key is missing
+        return _fallback_video_script(listing_data)
+
     try:
         response = ai_client.chat.completions.create(
             model="gpt-4o-mini",
-            messages=[
-                {"role":"system","content":"You are a top-tier automotive copywriter."},
-                {"role":"user","content":prompt}
-            ],
+            messages=_video_script_messages(listing_data),
             temperature=0.7
         )
-        return response.choices[0].message.content.strip() if response and getattr(response, "choices", None) else ""
+        return _script_text(response)
     except Exception as e:
         # Fallback if API call fails (e.g., network error)
-        return f"⚠️ Error generating script: {e}\n\n[Fallback: Contact DealerCommand today to book a test drive!]"
+        return _script_error(e)
+
+async def agenerate_ai_video_script(listing_data, client):
+    try:
+        response = await client.chat.completions.create(
+            model="gpt-4o-mini",
+            messages=_video_script_messages(listing_data),
+            temperature=0.7
+        )
+        return _script_text(response)
+    except Exception as e:
+        return _script_error(e)
+
+async def _agenerate_video_scripts(items, max_concurrency, agenerate=agenerate_ai_video_script):
+    # Async clients are bound to the running event loop, so one per batch
+    client = AsyncOpenAI(api_key=API_KEY)
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def run(item):
+        async with semaphore:
+            return await agenerate(item, client)
+
+    try:
+        return await asyncio.gather(*[run(item) for item in items])
+    finally:
+        await client.close()
+
+def _batch_script_messages(listings):
+    cars = "\n\n".join(
+        f"Car {i}:\n{_listing_fields(_ListingFields(listing_data))}"
+        for i, listing_data in enumerate(listings, 1)
+    )
+    return [_SCRIPT_SYSTEM_MESSAGE, {"role":"user","content":_BATCH_SCRIPT_PROMPT(count=len(listings), cars=cars)}]
+
+async def _agenerate_script_batch(batch, client):
+    """One call for the whole batch; falls back to per-listing calls if the reply doesn't parse."""
+    try:
+        response = await client.chat.completions.create(
+            model="gpt-4o-mini",
+            messages=_batch_script_messages(batch),
+            temperature=0.7,
+            response_format={"type": "json_object"}
+        )
+        scripts = json.loads(_script_text(response)).get("scripts")
+        if isinstance(scripts, list) and len(scripts) == len(batch):
+            return [str(script).strip() for script in scripts]
+    except Exception as e:
+        print("batched video script generation failed, retrying per listing:", e)
+    return await asyncio.gather(*[agenerate_ai_video_script(listing_data, client) for listing_data in batch])
+
+def generate_ai_video_scripts(email, listings, max_concurrency=MAX_CONCURRENT_SCRIPTS):
+    """
+    Video scripts for several listings, with up to `max_concurrency` OpenAI
+    calls in flight. Returns scripts in the same order as `listings`.
+    """
+    if not API_KEY:
+        return [_fallback_video_script(listing_data) for listing_data in listings]
+    return asyncio.run(_agenerate_video_scripts(listings, max_concurrency))
+
+def generate_ai_video_scripts_batched(email, listings, batch_size=SCRIPT_BATCH_SIZE, max_concurrency=MAX_CONCURRENT_SCRIPTS):
+    """
+    Like generate_ai_video_scripts, but packs `batch_size` listings into each
+    OpenAI request (the model returns a JSON list of scripts), so N listings
+    cost about N / batch_size requests against the rate limit.
+    """
+    if not API_KEY:
+        return [_fallback_video_script(listing_data) for listing_data in listings]
+    batches = [listings[i:i + batch_size] for i in range(0, len(listings), batch_size)]
+    results = asyncio.run(_agenerate_video_scripts(batches, max_concurrency, _agenerate_script_batch))
+    return [script for batch_scripts in results for script in batch_scripts]
 
 # ----------------------
 # COMPETITOR MONITORING
@@ -178,12 +371,15 @@ def competitor_monitoring(email, make="BMW", seed=1):
     """
     random.seed(seed)
     base_price = random.randint(45000, 55000)
-    data = [
-        {"Competitor": "Local Auto Co.", "Model": f"{make} X", "Price": base_price + random.randint(500, 2000), "Location": "Local"},
-        {"Competitor": "Regional Hub", "Model": f"{make} Z", "Price": base_price - random.randint(500, 1500), "Location": "Online"},
-        {"Competitor": "DealerCommand Avg", "Model": f"{make} Avg", "Price": base_price, "Location": "Market Average"}
-    ]
-    return pd.DataFrame(data)
+    # Built column-wise; draws stay in the same order so a seed gives the same prices
+    above = random.randint(500, 2000)
+    below = random.randint(500, 1500)
+    return pd.DataFrame({
+        "Competitor": ["Local Auto Co.", "Regional Hub", "DealerCommand Avg"],
+        "Model": [f"{make} X", f"{make} Z", f"{make} Avg"],
+        "Price": [base_price + above, base_price - below, base_price],
+        "Location": ["Local", "Online", "Market Average"]
+    })
 
 # ----------------------
 # WEEKLY CONTENT CALENDAR
@@ -195,34 +391,46 @@ def generate_weekly_content_calendar(email, top_n=3, seed=1):
         return pd.DataFrame()
 
     week_days = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
-    calendar_rows = []
-    
+
     # Use top 3 cars from mock inventory
-    top_listings = inventory_df.head(top_n).to_dict(orient='records')
-
-    for i, listing in enumerate(top_listings):
-        day_index = (i * 2) % 7 # Spread posts out
-        
-        # Post 1: Listing Spotlight
-        calendar_rows.append({
-            "Day": week_days[day_index],
-            "Car": f"{listing.get('Make', '')} {listing.get('Model', '')}",
-            "Content": f"Listing Spotlight: {listing.get('Color')} {listing.get('Make')} with {listing.get('Features')}! Asking Price: {listing.get('Price')}",
-            "Platform": "Instagram/Facebook",
-            "Post_Type": "Listing Spotlight"
-        })
-        
-        # Post 2: Engagement/Tip
-        day_index = (i * 2 + 1) % 7
-        calendar_rows.append({
-            "Day": week_days[day_index],
-            "Car": "N/A",
-            "Content": random.choice(["Quick Tip: Best practices for winter tire storage.", "Engage: What's your dream car color?", "Dealership News: Holiday service hours."]),
-            "Platform": random.choice(["TikTok", "Instagram Story"]),
-            "Post_Type": "Engagement/Tip"
-        })
-
-    df_calendar = pd.DataFrame(calendar_rows).sort_values(by="Day", key=lambda x: x.map({day: i for i, day in enumerate(week_days)}))
+    top_listings = inventory_df.head(top_n)
+    n = len(top_listings)
+
+    # Each caption column converted to strings once, straight from the frame (no records)
+    cols = {
+        name: top_listings[name].astype(str).to_numpy(dtype=object) if name in top_listings
+        else np.full(n, "None", dtype=object)
+        for name in ("Make", "Model", "Color", "Features", "Price")
+    }
+
+    # Two posts per car, built straight into column arrays: even rows are the
+    # Listing Spotlight, odd rows the Engagement/Tip, spread out over the week.
+    car = np.full(2 * n, "N/A", dtype=object)
+    content = np.empty(2 * n, dtype=object)
+    platform = np.empty(2 * n, dtype=object)
+    post_type = np.tile(np.array(["Listing Spotlight", "Engagement/Tip"], dtype=object), n)
+
+    car[0::2] = cols["Make"] + " " + cols["Model"]
+    content[0::2] = ("Listing Spotlight: " + cols["Color"] + " " + cols["Make"] + " with " + cols["Features"]
+                     + "! Asking Price: " + cols["Price"])
+    platform[0::2] = "Instagram/Facebook"
+    # Drawn in the same order as before (content, platform per listing) so seeds give the same calendar
+    for j in range(1, 2 * n, 2):
+        content[j] = random.choice(["Quick Tip: Best practices for winter tire storage.", "Engage: What's your dream car color?", "Dealership News: Holiday service hours."])
+        platform[j] = random.choice(["TikTok", "Instagram Story"])
+
+    # Row j is posted on day j % 7; a stable argsort orders the week without a sort key
+    day_index = np.arange(2 * n) % 7
+    order = np.argsort(day_index, kind="stable")
+    df_calendar = pd.DataFrame({
+        # Ordered categorical straight from the day codes: any later sort on Day
+        # follows the week, compared as integer codes
+        "Day": pd.Categorical.from_codes(day_index, categories=week_days, ordered=True),
+        "Car": car,
+        "Content": content,
+        "Platform": platform,
+        "Post_Type": post_type
+    }).iloc[order]
     return df_calendar
 
 # ----------------------
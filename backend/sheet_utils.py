@@ -1,27 +1,83 @@
 # backend/sheet_utils.py
 import os
 import json
+import time
+import threading
 import requests
+from requests.adapters import HTTPAdapter
 import pandas as pd
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime
+from functools import wraps
 import streamlit as st
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ModuleNotFoundError:
+    ORJSON_AVAILABLE = False
+
 
 # Set your Apps Script Web App URL in env or here:
 APPS_SCRIPT_URL = os.environ.get(
     "APPS_SCRIPT_URL"
 ) or "https://script.google.com/macros/s/AKfycbzI_ZIoU6sMFBJv7GnehZ6Fkj4EXMm2oceIO3vfdJRjlKrSr3T4fH1IY0A4-csNYypr/exec"
 TIMEOUT = 15
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+# Transient failures are retried with exponential backoff. Reads retry on any
+# throttling/server status or dropped connection; writes only where the
+# request was rejected before it ran, so an append is never applied twice.
+READ_ACTIONS = frozenset({"get_records", "get_records_batch", "query", "raw_sheet"})
+READ_RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+WRITE_RETRY_STATUSES = frozenset({429, 503})
+MAX_ATTEMPTS = 5
+RETRY_BACKOFF = 0.5  # seconds, doubled per attempt
+RETRY_BACKOFF_MAX = 8
+WRITE_CONCURRENCY = 5  # in-flight writes, keeps bursts under the write quota
+_write_slots = threading.BoundedSemaphore(WRITE_CONCURRENCY)
+
+# One keep-alive session for every call: warm requests reuse a pooled TLS
+# connection instead of handshaking again. The adapter itself doesn't retry;
+# call_script's own retry loop decides what is safe to resend.
+CONNECT_TIMEOUT = 3.05  # seconds to establish a connection; TIMEOUT bounds the response
+HTTP_POOL_SIZE = 10  # covers the concurrent reads of prefetch / dashboard fan-out
+_session = requests.Session()
+_session.mount("https://", HTTPAdapter(pool_connections=HTTP_POOL_SIZE, pool_maxsize=HTTP_POOL_SIZE, max_retries=0))
 
 # -----------------------
 # CORE HELPER TO CALL APPS SCRIPT
 # -----------------------
 def call_script(payload, method="POST"):
     try:
-        if method.upper() == "GET":
-            resp = requests.get(APPS_SCRIPT_URL, params=payload, timeout=TIMEOUT)
+        method = method.upper()
+        is_read = method == "GET" or payload.get("action") in READ_ACTIONS
+        retry_statuses = READ_RETRY_STATUSES if is_read else WRITE_RETRY_STATUSES
+        if method == "GET":
+            send = lambda: _session.get(APPS_SCRIPT_URL, params=payload, timeout=(CONNECT_TIMEOUT, TIMEOUT))
         else:
-            resp = requests.post(APPS_SCRIPT_URL, json=payload, timeout=TIMEOUT)
+            # Encoded once here; values JSON can't represent (datetimes, numpy
+            # scalars, ...) are sent as their str()
+            body = json.dumps(payload, default=str, allow_nan=False).encode("utf-8")
+            send = lambda: _session.post(APPS_SCRIPT_URL, data=body, headers=JSON_HEADERS, timeout=(CONNECT_TIMEOUT, TIMEOUT))
+
+        for attempt in range(MAX_ATTEMPTS):
+            last = attempt == MAX_ATTEMPTS - 1
+            try:
+                if is_read:
+                    resp = send()
+                else:
+                    with _write_slots:
+                        resp = send()
+            except (requests.ConnectionError, requests.Timeout):
+                if not is_read or last:
+                    raise
+            else:
+                if resp.status_code not in retry_statuses or last:
+                    break
+            time.sleep(min(RETRY_BACKOFF * 2 ** attempt, RETRY_BACKOFF_MAX))
+
         if resp.status_code != 200:
             return {"success": False, "error": f"HTTP {resp.status_code} - {resp.text}"}
         return resp.json()
@@ -29,34 +85,226 @@ def call_script(payload, method="POST"):
         return {"success": False, "error": str(e)}
 
 
+# -----------------------
+# READ CACHE
+# -----------------------
+CACHE_TTL = 60
+CACHE_MAXSIZE = 256
+_MISSING = object()
+_read_caches = []
+# Write generations, bumped by invalidate_cache: per sheet, plus an epoch for
+# invalidate-everything. A read started before a write to its sheet isn't stored.
+_sheet_generations = {}
+_generation_epoch = 0
+_generation_lock = threading.Lock()
+
+
+def _generation(sheet_name):
+    with _generation_lock:
+        return _generation_epoch, _sheet_generations.get(sheet_name, 0)
+
+
+def ttl_cache(ttl=CACHE_TTL, maxsize=CACHE_MAXSIZE, copy=True, sheet=None):
+    """
+    Memoises a sheet read per argument tuple for `ttl` seconds so one page
+    render does a single Apps Script round trip. Concurrent misses for the
+    same arguments share one in-flight read. DataFrames are copied on the
+    way out (unless copy=False) so callers can mutate them freely.
+    `sheet` names the sheet the function reads, for invalidate_cache; by
+    default its first positional argument is the sheet name.
+    The wrapper's is_cached(*args) / prime(args, value, generation) let a
+    batched read fill several entries at once; `generation` is
+    _generation(sheet name) taken before the read.
+    """
+    def decorator(fn):
+        cache = OrderedDict()
+        inflight = {}
+        lock = threading.Lock()
+        _read_caches.append((cache, inflight, lock, sheet))
+
+        def sheet_of(key):
+            return sheet or (key[0][0] if key[0] else None)
+
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            key = (args, tuple(sorted(kwargs.items())))
+            now = time.monotonic()
+            with lock:
+                expires_at, value = cache.get(key, (0, _MISSING))
+                if expires_at > now:
+                    cache.move_to_end(key)
+                else:
+                    value = _MISSING
+            if value is _MISSING:
+                with lock:
+                    future = inflight.get(key)
+                    owner = future is None
+                    if owner:
+                        future = inflight[key] = Future()
+                        generation = _generation(sheet_of(key))
+                if owner:
+                    try:
+                        value = fn(*args, **kwargs)
+                    except BaseException as e:
+                        future.set_exception(e)
+                        raise
+                    finally:
+                        with lock:
+                            if inflight.get(key) is future:
+                                del inflight[key]
+                    future.set_result(value)
+                    store(key, now, value, generation)
+                else:
+                    value = future.result()
+            return value.copy() if copy and isinstance(value, pd.DataFrame) else value
+
+        def store(key, now, value, generation):
+            # Reads that started before a write to their sheet aren't kept
+            with lock:
+                if generation == _generation(sheet_of(key)):
+                    cache[key] = (now + ttl, value)
+                    cache.move_to_end(key)
+                    while len(cache) > maxsize:
+                        cache.popitem(last=False)
+
+        def is_cached(*args, **kwargs):
+            key = (args, tuple(sorted(kwargs.items())))
+            with lock:
+                return cache.get(key, (0, None))[0] > time.monotonic()
+
+        def prime(args, value, generation):
+            """Caches `value` as the result for positional `args`, read at `generation`."""
+            store((tuple(args), ()), time.monotonic(), value, generation)
+
+        wrapper.is_cached = is_cached
+        wrapper.prime = prime
+        return wrapper
+    return decorator
+
+
+def invalidate_cache(sheet_name=None):
+    """
+    Drops the cached reads of `sheet_name` (every cached read if None).
+    Called after any write with the sheet it wrote to.
+    """
+    global _generation_epoch
+    with _generation_lock:
+        if sheet_name is None:
+            _generation_epoch += 1
+        else:
+            _sheet_generations[sheet_name] = _sheet_generations.get(sheet_name, 0) + 1
+    for cache, inflight, lock, sheet in _read_caches:
+        with lock:
+            if sheet_name is None or sheet == sheet_name:
+                cache.clear()
+                inflight.clear()
+            elif sheet is None:
+                for store in (cache, inflight):
+                    for key in [k for k in store if k[0][:1] == (sheet_name,)]:
+                        del store[key]
+
+
+_write_listeners = []
+
+
+def on_write(listener):
+    """
+    Registers `listener(sheet_name, email)` to be called after every write,
+    for caches kept outside this module. Usable as a decorator.
+    """
+    _write_listeners.append(listener)
+    return listener
+
+
+def _written(sheet_name, emails):
+    """Invalidates `sheet_name`'s cached reads and tells the write listeners."""
+    invalidate_cache(sheet_name)
+    for email in emails:
+        for listener in _write_listeners:
+            try:
+                listener(sheet_name, email)
+            except Exception as e:
+                print("write listener error:", e)
+
+
 # -----------------------
 # BASIC DB FUNCTIONS
 # -----------------------
+# Records per append_batch request: a bulk import stays a handful of calls
+# while each one fits comfortably inside Apps Script's payload and run-time limits
+APPEND_BATCH_MAX = 500
+
 def save_record(record_type, email, data, record_id=None):
     payload = {"action": "append", "record_type": record_type, "email": email, "data": data}
     if record_id:
         payload["id"] = record_id
     res = call_script(payload)
+    _written(record_type, [email])
     return res if isinstance(res, dict) else {"success": False, "error": "Invalid response"}
 
 
+def _append_batch(records):
+    res = call_script({"action": "append_batch", "records": records})
+    if isinstance(res, dict) and res.get("success"):
+        return True
+    ok = True
+    for r in records:
+        payload = {"action": "append", **r}
+        res = call_script(payload)
+        ok = ok and isinstance(res, dict) and bool(res.get("success"))
+    return ok
+
+
+def save_records(records):
+    """
+    Appends many records in as few Apps Script round trips as possible:
+    one append_batch per APPEND_BATCH_MAX records, sent in order. `records`
+    is a list of dicts with record_type / email / data (and optionally id).
+    A batch the script rejects falls back to one append per record.
+    Returns True when every record was written.
+    """
+    if not records:
+        return True
+    ok = True
+    for start in range(0, len(records), APPEND_BATCH_MAX):
+        ok = _append_batch(records[start:start + APPEND_BATCH_MAX]) and ok
+    for record_type in {r.get("record_type") for r in records}:
+        _written(record_type, {r.get("email") for r in records if r.get("record_type") == record_type})
+    return ok
+
+
 def upsert_record(record_id, record_type, email, data):
     payload = {"action": "upsert", "id": record_id, "record_type": record_type, "email": email, "data": data}
-    return call_script(payload)
+    res = call_script(payload)
+    _written(record_type, [email])
+    return res
 
 
-def get_records(record_type=None, email=None, limit=None, since=None):
+class SheetReadError(Exception):
+    """Apps Script couldn't return the requested records."""
+
+
+def _fetch_records(record_type=None, email=None, limit=None, since=None):
+    """get_records, raising SheetReadError on failure instead of returning []."""
     payload = {"action": "get_records"}
     if record_type: payload["record_type"] = record_type
     if email: payload["email"] = email
     if limit: payload["limit"] = limit
     if since: payload["since"] = since
     res = call_script(payload)
-    if not res.get("success"):
-        return []
+    if not isinstance(res, dict) or not res.get("success"):
+        error = res.get("error") if isinstance(res, dict) else "Invalid response"
+        raise SheetReadError(f"get_records {record_type or ''} failed: {error}")
     return res.get("data", [])
 
 
+def get_records(record_type=None, email=None, limit=None, since=None):
+    try:
+        return _fetch_records(record_type, email, limit, since)
+    except SheetReadError:
+        return []
+
+
 def query_records(filters=None, record_type=None, email=None, limit=None):
     payload = {"action": "query"}
     if filters: payload["filters"] = filters
@@ -72,53 +320,208 @@ def query_records(filters=None, record_type=None, email=None, limit=None):
 def append_to_google_sheet(sheet_name, data_dict):
     try:
         email = data_dict.get("Email") or data_dict.get("email") or ""
-        clean_data = json.loads(json.dumps(data_dict, default=str))
-        res = save_record(record_type=sheet_name, email=email, data=clean_data)
+        res = save_record(record_type=sheet_name, email=email, data=data_dict)
         return bool(res.get("success"))
     except Exception as e:
         print("append_to_google_sheet error:", e)
         return False
 
 
-def get_sheet_data(sheet_name):
+def append_rows_to_google_sheet(sheet_name, rows):
+    """Bulk append_to_google_sheet: all rows go out in one request."""
     try:
-        raw = get_records(record_type=sheet_name)
-        if not raw:
-            return pd.DataFrame()
-        rows = []
-        for r in raw:
-            try:
-                parsed = r.get("Data_JSON_parsed") if "Data_JSON_parsed" in r else json.loads(r.get("Data_JSON","{}"))
-            except Exception:
-                parsed = {}
-            out = {"ID": r.get("ID"), "Email": r.get("Email"), "Record_Type": r.get("Record_Type"),
-                   "Created_At": r.get("Created_At"), "Updated_At": r.get("Updated_At")}
-            if isinstance(parsed, dict):
-                for k,v in parsed.items():
-                    out[k] = v
-            else:
-                out["Data"] = parsed
-            rows.append(out)
-        return pd.DataFrame(rows)
+        records = [
+            {"record_type": sheet_name,
+             "email": row.get("Email") or row.get("email") or "",
+             "data": row}
+            for row in rows
+        ]
+        return save_records(records)
+    except Exception as e:
+        print("append_rows_to_google_sheet error:", e)
+        return False
+
+
+def _loads_data_json(raw):
+    """Parses a record's Data_JSON; orjson when installed (stdlib for what it rejects, e.g. NaN)."""
+    if ORJSON_AVAILABLE:
+        try:
+            return orjson.loads(raw)
+        except orjson.JSONDecodeError:
+            pass
+    return json.loads(raw)
+
+
+@ttl_cache()
+def _read_sheet(sheet_name, email=None):
+    """
+    Cached read behind get_sheet_data. Failures raise rather than return an
+    empty frame, so a failed read is never cached (or taken for an empty
+    sheet by the lookups built on it).
+    """
+    return _records_frame(_fetch_records(record_type=sheet_name, email=email))
+
+
+def _read(sheet_name, email=None):
+    # Positional call so the cache key matches _read_sheet.is_cached(sheet_name)
+    return _read_sheet(sheet_name) if email is None else _read_sheet(sheet_name, email)
+
+
+def get_sheet_data(sheet_name, email=None):
+    """
+    The sheet as a DataFrame. Pass `email` to have Apps Script return only
+    that user's records instead of the whole sheet. Empty if the read fails.
+    """
+    try:
+        return _read(sheet_name, email)
     except Exception as e:
         print("get_sheet_data error:", e)
         return pd.DataFrame()
 
 
-def get_inventory_for_user(email):
-    df = get_sheet_data("Inventory")
-    if df.empty:
+def _records_frame(raw):
+    """Apps Script records -> DataFrame: record metadata plus the Data_JSON fields."""
+    if not raw:
+        return pd.DataFrame()
+    rows = []
+    for r in raw:
+        try:
+            parsed = r.get("Data_JSON_parsed") if "Data_JSON_parsed" in r else _loads_data_json(r.get("Data_JSON","{}"))
+        except Exception:
+            parsed = {}
+        out = {"ID": r.get("ID"), "Email": r.get("Email"), "Record_Type": r.get("Record_Type"),
+               "Created_At": r.get("Created_At"), "Updated_At": r.get("Updated_At")}
+        if isinstance(parsed, dict):
+            out.update(parsed)
+        else:
+            out["Data"] = parsed
+        rows.append(out)
+    return pd.DataFrame(rows)
+
+
+def prefetch_sheets(sheet_names):
+    """
+    Loads several whole sheets into the get_sheet_data cache with one Apps
+    Script round trip (get_records_batch), skipping sheets already cached.
+    Falls back to reading the missing sheets concurrently if the script
+    doesn't support the batch action.
+    """
+    missing = [name for name in dict.fromkeys(sheet_names) if not _read_sheet.is_cached(name)]
+    if not missing:
+        return
+    generations = {name: _generation(name) for name in missing}
+    res = call_script({"action": "get_records_batch", "record_types": missing})
+    data = res.get("data") if isinstance(res, dict) and res.get("success") else None
+    if isinstance(data, dict):
+        # Only prime what the script actually returned; a name missing from
+        # the response is read normally rather than cached as empty
+        for name in [n for n in missing if n in data]:
+            try:
+                frame = _records_frame(data[name])
+            except Exception as e:
+                print("prefetch_sheets error:", e)
+                continue
+            _read_sheet.prime((name,), frame, generations[name])
+        missing = [name for name in missing if name not in data]
+        if not missing:
+            return
+    with ThreadPoolExecutor(max_workers=len(missing)) as ex:
+        list(ex.map(get_sheet_data, missing))
+
+
+def get_multi_sheet_data(sheet_names):
+    """{sheet name: DataFrame} for several whole sheets, fetched together by prefetch_sheets."""
+    prefetch_sheets(sheet_names)
+    return {name: get_sheet_data(name) for name in sheet_names}
+
+
+def frame_records(df):
+    """
+    df.to_dict(orient="records") built column-wise: one tolist() per column
+    (native Python values, converted in C) zipped into row dicts, instead of
+    pandas boxing every cell individually.
+    """
+    cols = list(df.columns)
+    return [dict(zip(cols, row)) for row in zip(*(_column_values(df[c]) for c in cols))]
+
+
+def _column_values(series):
+    values = series.tolist()
+    # Nullable extension dtypes (Int64, boolean, ...) yield pd.NA; to_dict gives None
+    if isinstance(series.dtype, pd.api.extensions.ExtensionDtype) and series.hasnans:
+        values = [None if v is pd.NA else v for v in values]
+    return values
+
+
+@ttl_cache(copy=False)
+def _email_groups(sheet_name):
+    """
+    Splits the sheet once into {lower-cased email: rows} (each group keeps
+    sheet order), plus the column list for users with no rows. Read-only;
+    use get_rows_for_email.
+    """
+    df = _read(sheet_name)
+    if df.empty or "Email" not in df.columns:
+        return df.columns, {}
+    key = df["Email"].astype(str).str.lower()
+    return df.columns, {k: g.reset_index(drop=True) for k, g in df.groupby(key, sort=False)}
+
+
+def get_rows_for_email(sheet_name, email):
+    """
+    Rows of `sheet_name` belonging to `email` (case-insensitive). A dict
+    lookup into the cached per-email groups instead of a lower-case scan of
+    the column on every call. Empty if the sheet can't be read.
+    """
+    try:
+        columns, groups = _email_groups(sheet_name)
+    except Exception as e:
+        print("get_rows_for_email error:", e)
+        return pd.DataFrame()
+    rows = groups.get(str(email).lower())
+    if rows is None:
+        return pd.DataFrame(columns=columns)
+    return rows.copy()
+
+
+def _fetch_rows_for_email(sheet_name, email):
+    """
+    Rows of `sheet_name` for `email`, filtered by Apps Script so only that
+    user's records cross the wire; the case-insensitive match is re-applied
+    locally. Empty frame if there are none; raises if the read fails.
+    """
+    df = _read(sheet_name, email)
+    if df.empty or "Email" not in df.columns:
         return pd.DataFrame()
     df["Email"] = df["Email"].astype(str)
-    return df[df["Email"].str.lower() == str(email).lower()].copy()
+    df = df[df["Email"].str.lower() == str(email).lower()].reset_index(drop=True)
+    return df if not df.empty else pd.DataFrame()
+
+
+def _rows_for_email_or_empty(sheet_name, email):
+    # The per-user read itself is cached (by _read_sheet); only a failure,
+    # which isn't, comes back as an empty frame here
+    try:
+        return _fetch_rows_for_email(sheet_name, email)
+    except Exception as e:
+        print(f"{sheet_name} read error:", e)
+        return pd.DataFrame()
+
+
+def get_inventory_for_user(email):
+    """The user's Inventory items, without the ones flagged Deleted."""
+    df = _rows_for_email_or_empty("Inventory", email)
+    if "Deleted" in df.columns:
+        df = df[df["Deleted"].astype(str).str.upper() != "YES"].reset_index(drop=True)
+    return df
 
 
 def get_listing_history_df(email=None):
+    if email:
+        return _rows_for_email_or_empty("Listings", email)
     df = get_sheet_data("Listings")
     if df.empty:
         return pd.DataFrame()
-    if email:
-        df = df[df["Email"].astype(str).str.lower() == email.lower()]
     return df
 
 
@@ -129,9 +532,12 @@ def migrate_sheet_tab(tab_name, email_field=None):
         if not resp.get("success"):
             return False, resp.get("error","unknown")
         rows = resp.get("data",[])
-        for r in rows:
-            email = r.get(email_field) if email_field else (r.get("Email") or "")
-            save_record(record_type=tab_name, email=email, data=r)
+        save_records([
+            {"record_type": tab_name,
+             "email": r.get(email_field) if email_field else (r.get("Email") or ""),
+             "data": r}
+            for r in rows
+        ])
         return True, f"Migrated {len(rows)} rows from {tab_name}"
     except Exception as e:
         return False, str(e)
@@ -147,40 +553,106 @@ def get_user_activity_data(email=None):
 def upsert_to_sheet(sheet_name, key_col="Email", data_dict=None):
     """
     Generic upsert helper for a sheet.
-    Updates row by key_col if exists, else appends.
+    Updates row by key_col if exists, else appends. Returns True on success.
     """
-    df = get_sheet_data(sheet_name)
     key_val = data_dict.get(key_col)
-    if df.empty or key_val not in df.get(key_col, []).values:
+    try:
+        row = _row_for_key(sheet_name, key_col, key_val)
+    except Exception as e:
+        # Can't tell whether the row exists: appending could duplicate it
+        print("upsert_to_sheet lookup failed:", e)
+        return False
+    if row is None:
         return append_to_google_sheet(sheet_name, data_dict)
-    else:
-        # Find existing row and update
-        row = df[df[key_col] == key_val].iloc[0]
-        record_id = row.get("ID")
-        return upsert_record(record_id, sheet_name, key_val, data_dict)
+    # Update the first existing row with this key (keeping its Email when
+    # the key is another column, e.g. an inventory item's ID)
+    email = key_val if key_col == "Email" else data_dict.get("Email") or row.get("Email", "")
+    res = upsert_record(row.get("ID"), sheet_name, email, data_dict)
+    return isinstance(res, dict) and bool(res.get("success"))
+
+
+def _row_for_key(sheet_name, key_col, key_val):
+    """
+    First row whose `key_col` equals `key_val`, as a dict, or None. Keyed by
+    Email with the sheet not already cached, only that user's records are
+    read (filtered by Apps Script) instead of downloading the whole sheet.
+    """
+    if key_col == "Email" and key_val and not _read_sheet.is_cached(sheet_name):
+        df = _read(sheet_name, key_val)
+        if df.empty or key_col not in df.columns:
+            return None
+        match = df[df[key_col] == key_val]
+        return frame_records(match.iloc[:1])[0] if not match.empty else None
+    return _key_rows(sheet_name, key_col).get(key_val)
+
+
+@ttl_cache(copy=False)
+def _key_rows(sheet_name, key_col):
+    """
+    {key value: first row with that key, as a dict} for upsert lookups, built
+    once per cached sheet read instead of scanning (and copying) the sheet
+    per upsert. Read-only.
+    """
+    df = _read(sheet_name)
+    if df.empty or key_col not in df.columns:
+        return {}
+    first = df.drop_duplicates(subset=key_col, keep="first")
+    return dict(zip(first[key_col].tolist(), frame_records(first)))
 
 
 # -----------------------
 # DEALERSHIP PROFILE HELPERS
 # -----------------------
-def get_dealership_profile(email):
-    df = get_sheet_data("Dealership_Profiles")
-    if df.empty:
+@ttl_cache(copy=False)
+def _first_rows_by_email(sheet_name):
+    """
+    {lower-cased email: first row as a dict}, built column-wise once per
+    cached sheet read so single-row lookups don't box a row per call.
+    Read-only; use _first_row_for_email.
+    """
+    df = _read(sheet_name)
+    if df.empty or "Email" not in df.columns:
         return {}
-    row = df[df["Email"].astype(str).str.lower() == email.lower()]
-    if row.empty:
+    key = df["Email"].astype(str).str.lower()
+    first = df[~key.duplicated()]
+    return dict(zip(key[first.index].tolist(), frame_records(first)))
+
+
+def _first_row_for_email(sheet_name, email):
+    """
+    First row of `email` in `sheet_name` as a (fresh) dict, or None. Reads
+    just that user's records unless the whole sheet is already cached.
+    Raises if the sheet can't be read.
+    """
+    if not _read_sheet.is_cached(sheet_name):
+        rows = _fetch_rows_for_email(sheet_name, email)
+        return frame_records(rows.iloc[:1])[0] if not rows.empty else None
+    row = _first_rows_by_email(sheet_name).get(str(email).lower())
+    return None if row is None else dict(row)
+
+
+def get_dealership_profile(email):
+    try:
+        row = _first_row_for_email("Dealership_Profiles", email)
+    except Exception as e:
+        print("get_dealership_profile error:", e)
         return {}
-    return row.iloc[0].to_dict()
+    return {} if row is None else row
 
 
 def save_dealership_profile(email, profile_dict):
-    df = get_sheet_data("Dealership_Profiles")
-    existing = df[df["Email"].astype(str).str.lower() == email.lower()] if not df.empty else pd.DataFrame()
-    if existing.empty:
+    try:
+        row = _first_row_for_email("Dealership_Profiles", email)
+    except Exception as e:
+        # Can't tell whether the profile exists: appending could duplicate it
+        print("save_dealership_profile lookup failed:", e)
+        return False
+    if row is None:
         return append_to_google_sheet("Dealership_Profiles", {"Email": email, **profile_dict})
     else:
-        record_id = existing.iloc[0].get("ID")
-        return upsert_record(record_id, "Dealership_Profiles", email, {"Email": email, **profile_dict})
+        record_id = row.get("ID")
+        res = upsert_record(record_id, "Dealership_Profiles", email, {"Email": email, **profile_dict})
+        return isinstance(res, dict) and bool(res.get("success"))
 
 
 def api_get_dealership_profile(email):
@@ -227,15 +699,12 @@ def api_get_inventory(email: str):
     Returns all inventory rows for a dealership based on email.
     Assumes sheet 'Inventory' contains a column 'Email' linking items.
     """
-    df = get_sheet_data("Inventory")
-    if df.empty:
+    data = get_rows_for_email("Inventory", email)
+    if data.empty:
         return []
 
-    df["Email_lower"] = df["Email"].astype(str).str.lower()
-    data = df[df["Email_lower"] == email.lower()]
-
     # Convert dataframe rows to dicts
-    return data.drop(columns=["Email_lower"], errors="ignore").to_dict(orient="records")
+    return frame_records(data)
 
 
 def api_upsert_inventory(email: str, item: dict):
@@ -253,6 +722,49 @@ def api_upsert_inventory(email: str, item: dict):
     return True
 
 
+def save_inventory_item(email: str, item):
+    """
+    Appends an inventory item (keyed by its "ID") to the Inventory sheet.
+    Pass a list of dicts for bulk imports: they are written in one batched
+    request. The item ID is used as the record ID, so update_inventory_item
+    and delete_inventory_item address the same record.
+    """
+    items = item if isinstance(item, list) else [item]
+    try:
+        return save_records([
+            {"record_type": "Inventory", "email": email, "data": {**i, "Email": email},
+             **({"id": i["ID"]} if i.get("ID") else {})}
+            for i in items
+        ])
+    except Exception as e:
+        print("save_inventory_item error:", e)
+        return False
+
+
+def update_inventory_item(email: str, item: dict):
+    """Updates the inventory item with item["ID"] (appends it if there is none)."""
+    if not item.get("ID"):
+        raise ValueError("Inventory item must include ID")
+    return upsert_to_sheet("Inventory", key_col="ID", data_dict={**item, "Email": email})
+
+
+def delete_inventory_item(item_id: str, email: str = None):
+    """
+    Deletes an inventory item by setting its 'Deleted' flag. With `email`,
+    only an item belonging to that dealer is deleted.
+    """
+    row = None
+    try:
+        row = _key_rows("Inventory", "ID").get(item_id)
+    except Exception as e:
+        print("delete_inventory_item lookup failed:", e)
+    if row is None:
+        return False
+    if email is not None and str(row.get("Email", "")).lower() != str(email).lower():
+        return False
+    return update_inventory_item(row.get("Email", ""), {"ID": item_id, "Deleted": "YES"})
+
+
 def api_delete_inventory(listing_id: str):
     """
     Deletes an inventory listing by setting a 'Deleted' flag.
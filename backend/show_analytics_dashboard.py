@@ -3,11 +3,34 @@ import streamlit as st
 import pandas as pd
 import numpy as np
 import plotly.express as px
+import plotly.io as pio
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
 from backend.analytics import get_user_analytics_data, platinum_recommendations
 from backend.trial_manager import ensure_user_and_get_status
 
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ModuleNotFoundError:
+    NUMBA_AVAILABLE = False
+
+# Static PNG export (kaleido) is CPU-bound; run it off the script thread so
+# the remaining charts render while the image is produced.
+_chart_export_pool = ThreadPoolExecutor(max_workers=2)
+
+# Rendered at a fixed, screen-sized resolution; the default kaleido export
+# size/scale costs more than a download button needs.
+PNG_EXPORT_WIDTH = 900
+PNG_EXPORT_HEIGHT = 500
+PNG_CACHE_MAXSIZE = 32
+_png_cache = OrderedDict()
+_png_cache_lock = threading.Lock()
+
 # -----------------------------
 # Helpers
 # -----------------------------
@@ -22,18 +45,20 @@ def show_demo_badge():
     )
 
 def load_demo_data():
-    np.random.seed(42)
+    rng = np.random.default_rng(42)  # local generator: leaves global RNG state alone
     demo_dates = pd.date_range(end=datetime.today(), periods=12, freq="M")
+    # [Revenue, Reach, Impressions, Price]
+    metrics = rng.integers([2000, 5000, 10000, 20000], [10000, 20000, 40000, 50000], size=(12, 4))
     return pd.DataFrame({
         "Date": demo_dates,
-        "Revenue": np.random.randint(2000, 10000, size=12),
-        "Reach": np.random.randint(5000, 20000, size=12),
-        "Impressions": np.random.randint(10000, 40000, size=12),
-        "Make": np.random.choice(["BMW","Audi","Mercedes","Toyota"], size=12),
-        "Model": np.random.choice(["X5","A3","C-Class","Corolla"], size=12),
-        "Platform": np.random.choice(["Facebook","Instagram","TikTok"], size=12),
-        "Price": np.random.randint(20000,50000, size=12),
-        "Fuel": np.random.choice(["Petrol","Diesel","Hybrid"], size=12)
+        "Revenue": metrics[:, 0],
+        "Reach": metrics[:, 1],
+        "Impressions": metrics[:, 2],
+        "Make": rng.choice(["BMW","Audi","Mercedes","Toyota"], size=12),
+        "Model": rng.choice(["X5","A3","C-Class","Corolla"], size=12),
+        "Platform": rng.choice(["Facebook","Instagram","TikTok"], size=12),
+        "Price": metrics[:, 3],
+        "Fuel": rng.choice(["Petrol","Diesel","Hybrid"], size=12)
     })
 
 def df_to_csv_bytes(df):
@@ -52,16 +77,69 @@ def get_filtered_data(df, make, model, platform, date_range):
         filtered = filtered[(filtered["Date"] >= start_dt) & (filtered["Date"] <= end_dt)]
     return filtered
 
+def _kpi_totals_py(revenue, price, reach):
+    """One pass over the KPI columns: NaN-skipping sums and counts."""
+    rev_sum = price_sum = reach_sum = 0.0
+    price_n = reach_n = 0
+    for i in range(revenue.shape[0]):
+        if revenue[i] == revenue[i]:
+            rev_sum += revenue[i]
+        if price[i] == price[i]:
+            price_sum += price[i]
+            price_n += 1
+        if reach[i] == reach[i]:
+            reach_sum += reach[i]
+            reach_n += 1
+    return rev_sum, price_sum, price_n, reach_sum, reach_n
+
+if NUMBA_AVAILABLE:
+    _kpi_totals = njit(cache=True)(_kpi_totals_py)
+else:
+    def _kpi_totals(revenue, price, reach):
+        return (np.nansum(revenue), np.nansum(price), int(np.count_nonzero(~np.isnan(price))),
+                np.nansum(reach), int(np.count_nonzero(~np.isnan(reach))))
+
+def _float_column(df, col):
+    if col not in df.columns:
+        return np.full(len(df), np.nan)
+    return pd.to_numeric(df[col], errors="coerce").to_numpy(dtype=np.float64, na_value=np.nan)
+
 def calculate_kpis(df):
     if df.empty:
         return {"total_revenue":0, "avg_price":0, "total_listings":0, "avg_reach":0}
+    rev_sum, price_sum, price_n, reach_sum, reach_n = _kpi_totals(
+        _float_column(df, "Revenue"), _float_column(df, "Price"), _float_column(df, "Reach")
+    )
     return {
-        "total_revenue": int(df["Revenue"].sum()),
-        "avg_price": int(df["Price"].mean()),
+        "total_revenue": int(rev_sum),
+        "avg_price": int(price_sum / price_n) if price_n else 0,
         "total_listings": len(df),
-        "avg_reach": int(df["Reach"].mean()) if "Reach" in df.columns else 0
+        "avg_reach": int(reach_sum / reach_n) if reach_n else 0
     }
 
+def _render_png(fig_json):
+    fig = pio.from_json(fig_json)
+    return fig.to_image(format="png", width=PNG_EXPORT_WIDTH, height=PNG_EXPORT_HEIGHT, scale=1)
+
+def export_chart_png(fig):
+    """
+    Starts a PNG export of `fig` in the background and returns its Future.
+    Exports are keyed on the figure's JSON, so Streamlit reruns that draw the
+    same chart reuse the finished image instead of rendering it again.
+    """
+    fig_json = fig.to_json()
+    key = hashlib.sha256(fig_json.encode("utf-8")).hexdigest()
+    with _png_cache_lock:
+        future = _png_cache.get(key)
+        if future is None:
+            future = _chart_export_pool.submit(_render_png, fig_json)
+            _png_cache[key] = future
+            while len(_png_cache) > PNG_CACHE_MAXSIZE:
+                _png_cache.popitem(last=False)
+        else:
+            _png_cache.move_to_end(key)
+    return future
+
 def plot_revenue_charts(df):
     rev_df = df.groupby(pd.Grouper(key="Date", freq="M"))["Revenue"].sum().reset_index()
     if rev_df.empty:
@@ -101,13 +179,17 @@ def show_analytics_dashboard(user_email):
         analytics_df = load_demo_data()
         show_demo_badge()
 
-    # Ensure correct types
-    for col in ["Date", "Price", "Revenue"]:
+    # Ensure correct types (columns that already have them, e.g. demo data, are left as is)
+    if "Date" in analytics_df.columns and not pd.api.types.is_datetime64_any_dtype(analytics_df["Date"]):
+        analytics_df["Date"] = pd.to_datetime(analytics_df["Date"], errors="coerce")
+    for col in ["Price", "Revenue"]:
         if col in analytics_df.columns:
-            if col == "Date":
-                analytics_df[col] = pd.to_datetime(analytics_df[col], errors="coerce")
-            else:
-                analytics_df[col] = pd.to_numeric(analytics_df[col], errors="coerce").fillna(0)
+            values = analytics_df[col]
+            if not pd.api.types.is_numeric_dtype(values):
+                values = pd.to_numeric(values, errors="coerce")
+            if values.hasnans:
+                values = values.fillna(0)
+            analytics_df[col] = values
 
     # -----------------------------
     # Filters
@@ -147,14 +229,12 @@ def show_analytics_dashboard(user_email):
     st.markdown("### Revenue & Listings")
     c1, c2 = st.columns([2,1])
     rev_fig, cum_fig = plot_revenue_charts(filtered_df)
+    rev_png = None
     if rev_fig:
+        rev_png = export_chart_png(rev_fig)
         c1.plotly_chart(rev_fig, use_container_width=True)
         c1.plotly_chart(cum_fig, use_container_width=True)
-        try:
-            img = rev_fig.to_image(format="png")
-            st.download_button("⬇ Download Revenue chart (PNG)", img, file_name="revenue_chart.png", mime="image/png")
-        except Exception:
-            st.info("To download charts as PNG install 'kaleido'.")
+        rev_png_slot = st.empty()
 
     # Price distribution
     if not filtered_df.empty and "Price" in filtered_df.columns:
@@ -171,9 +251,16 @@ def show_analytics_dashboard(user_email):
     # Top models by revenue
     st.markdown("### Top Models")
     if "Model" in filtered_df.columns:
-        top_models = filtered_df.groupby("Model")["Revenue"].sum().reset_index().sort_values("Revenue", ascending=False).head(10)
+        top_models = filtered_df.groupby("Model")["Revenue"].sum().nlargest(10).reset_index()
         st.dataframe(top_models)
 
+    # Revenue chart PNG (exported in the background above)
+    if rev_png is not None:
+        try:
+            rev_png_slot.download_button("⬇ Download Revenue chart (PNG)", rev_png.result(), file_name="revenue_chart.png", mime="image/png")
+        except Exception:
+            rev_png_slot.info("To download charts as PNG install 'kaleido'.")
+
     # Platinum recommendations
     if effective_plan == "platinum":
         st.markdown("### 💡 AI Recommendations")
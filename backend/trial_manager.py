@@ -2,21 +2,27 @@ import pandas as pd
 from datetime import datetime, timedelta
 import random
 import os
+import time
+import threading
 
 # --- Assuming these functions exist in sheet_utils ---
 from backend.sheet_utils import (
     get_user_activity_data,
     upsert_to_sheet,
     get_sheet_data,
+    get_rows_for_email,
     get_dealership_profile,
     save_dealership_profile,
+    prefetch_sheets,
+    on_write,
 )
+from backend.constants import TRIAL_DAYS, MAX_FREE_LISTINGS
 
 # ----------------------
 # CONFIG
 # ----------------------
-TRIAL_DAYS = 30
-MAX_FREE_LISTINGS = 15  # Free trial limit
+STATUS_CACHE_TTL = 30  # seconds a dealership status is reused
+STATUS_CACHE_MAXSIZE = 1024
 TRIAL_API = "trial"
 
 # ----------------------
@@ -33,11 +39,7 @@ def _safe_parse_date(value, default=None):
 
 def _get_user_activity_row(email: str):
     """Returns the latest activity row for a given email, or None if not found."""
-    df = get_user_activity_data()
-    if df.empty:
-        return None
-    df["Email_lower"] = df["Email"].astype(str).str.lower()
-    matches = df[df["Email_lower"] == email.lower()]
+    matches = get_user_activity_data(email)
     # Since we use UPSERT, the last row should be the most up-to-date row.
     return matches.iloc[-1] if not matches.empty else None
 
@@ -150,10 +152,74 @@ def reset_trial(email: str):
 # ----------------------
 # DEALERSHIP PROFILE & STATUS
 # ----------------------
+_status_cache = {}
+_status_lock = threading.Lock()
+# Bumped by invalidate_dealership_status (per email, or the epoch for all):
+# a status built across an invalidation isn't stored
+_status_generations = {}
+_status_epoch = 0
+# Emails whose status the current thread is building, so the build's own
+# writes (ensure_user_and_get_status) don't invalidate it
+_building = threading.local()
+STATUS_SHEETS = ("User_Activity", "Dealership_Profiles")
+
+def _status_generation(key):
+    return _status_epoch, _status_generations.get(key, 0)
+
+def invalidate_dealership_status(email=None):
+    """Drops the cached status for `email` (or every email)."""
+    global _status_epoch
+    with _status_lock:
+        if email is None:
+            _status_epoch += 1
+            _status_generations.clear()
+            _status_cache.clear()
+        else:
+            key = str(email).lower()
+            _status_generations[key] = _status_generations.get(key, 0) + 1
+            _status_cache.pop(key, None)
+
+@on_write
+def _status_sheet_written(sheet_name, email):
+    """Any write to a sheet the status is built from (from any module) invalidates it."""
+    if sheet_name not in STATUS_SHEETS:
+        return
+    if not email:
+        invalidate_dealership_status()
+        return
+    if str(email).lower() in getattr(_building, "emails", ()):
+        return
+    invalidate_dealership_status(email)
+
 def get_dealership_status(email: str):
     """
     Returns full dealership profile combined with persistent usage and plan info.
+    Memoised per email for STATUS_CACHE_TTL seconds, since building it costs
+    several sheet round trips (and an upsert).
     """
+    key = str(email).lower()
+    now = time.monotonic()
+    with _status_lock:
+        expires_at, status = _status_cache.get(key, (0, None))
+        generation = _status_generation(key)
+    if expires_at <= now:
+        building = _building.__dict__.setdefault("emails", set())
+        building.add(key)
+        try:
+            status = _build_dealership_status(email)
+        finally:
+            building.discard(key)
+        with _status_lock:
+            # Not kept if the user's records were written while it was built
+            if generation == _status_generation(key):
+                _status_cache[key] = (now + STATUS_CACHE_TTL, status)
+                if len(_status_cache) > STATUS_CACHE_MAXSIZE:
+                    _status_cache.pop(next(iter(_status_cache)))
+    return dict(status)
+
+def _build_dealership_status(email: str):
+    # Both whole-sheet reads this needs (upsert lookup, profile) in one round trip
+    prefetch_sheets(["User_Activity", "Dealership_Profiles"])
     # Unpack 5 values (we ignore the 5th value: start_date)
     status, expiry, usage_count, base_plan, _ = ensure_user_and_get_status(email) 
     profile_details = get_dealership_profile(email)
@@ -195,19 +261,17 @@ def can_user_login(email, plan_name):
         return True # Allow login if profile data is unavailable
 
     # Get the user's base plan from the Dealership_Profiles sheet (not the effective trial status)
-    user_row = df_profiles[df_profiles["Email"].astype(str).str.lower() == email.lower()]
+    user_row = get_rows_for_email("Dealership_Profiles", email)
     base_plan = user_row.iloc[0].get("Plan", "Free Trial") if not user_row.empty else "Free Trial"
-    
-    plan_users = df_profiles[df_profiles["Plan"].astype(str).str.lower() == base_plan.lower()]
-    user_emails = plan_users["Email"].astype(str).str.lower().tolist()
     seat_limit = get_plan_seat_limit(base_plan)
     
-    # Check 1: Is the user already in the list?
-    if email.lower() in user_emails:
+    # Check 1: Is the user already in the list? (their own rows, already matched case-insensitively)
+    if not user_row.empty and (user_row["Plan"].astype(str).str.lower() == base_plan.lower()).any():
         return True
 
     # Check 2: Are there available seats for this plan?
-    if len(user_emails) < seat_limit:
+    seats_taken = int((df_profiles["Plan"].astype(str).str.lower() == base_plan.lower()).sum())
+    if seats_taken < seat_limit:
         return True
     
     return False
@@ -4,8 +4,11 @@ import streamlit as st
 import pandas as pd
 import numpy as np
 import plotly.express as px
+import hashlib
+import threading
+from collections import OrderedDict
 from datetime import datetime
-from backend.analytics import get_user_analytics_data, platinum_recommendations
+from backend.analytics import get_user_analytics_data, platinum_recommendations, dashboard_aggregates
 
 
 # -----------------------------
@@ -33,21 +36,80 @@ def show_demo_badge():
 # DEMO DATA GENERATION
 # -----------------------------
 def load_demo_data():
-    np.random.seed(42)
+    rng = np.random.default_rng(42)  # local generator: leaves global RNG state alone
     demo_dates = pd.date_range(end=datetime.today(), periods=12, freq="M")
+    # [Revenue, Reach, Impressions, Price]
+    metrics = rng.integers([2000, 5000, 10000, 20000], [10000, 20000, 40000, 50000], size=(12, 4))
     return pd.DataFrame({
         "Date": demo_dates,
-        "Revenue": np.random.randint(2000, 10000, size=12),
-        "Reach": np.random.randint(5000, 20000, size=12),
-        "Impressions": np.random.randint(10000, 40000, size=12),
-        "Make": np.random.choice(["BMW", "Audi", "Mercedes", "Toyota"], size=12),
-        "Model": np.random.choice(["X5", "A3", "C-Class", "Corolla"], size=12),
-        "Platform": np.random.choice(["Facebook", "Instagram", "TikTok"], size=12),
-        "Price": np.random.randint(20000, 50000, size=12),
-        "Fuel": np.random.choice(["Petrol", "Diesel", "Hybrid"], size=12)
+        "Revenue": metrics[:, 0],
+        "Reach": metrics[:, 1],
+        "Impressions": metrics[:, 2],
+        "Make": rng.choice(["BMW", "Audi", "Mercedes", "Toyota"], size=12),
+        "Model": rng.choice(["X5", "A3", "C-Class", "Corolla"], size=12),
+        "Platform": rng.choice(["Facebook", "Instagram", "TikTok"], size=12),
+        "Price": metrics[:, 3],
+        "Fuel": rng.choice(["Petrol", "Diesel", "Hybrid"], size=12)
     })
 
 
+# -----------------------------
+# CHART CACHE (keyed on data content)
+# -----------------------------
+CHART_COLUMNS = ["Date", "Make", "Model", "Platform", "Price", "Revenue", "Reach", "Impressions"]
+CHART_CACHE_MAXSIZE = 128
+_chart_cache = OrderedDict()
+_chart_cache_lock = threading.Lock()
+
+
+def frame_digest(df, cols=CHART_COLUMNS):
+    """Content hash of the chart input columns; equal data gives an equal digest."""
+    h = hashlib.blake2b(digest_size=16)
+    for col in cols:
+        if col in df.columns:
+            h.update(col.encode())
+            h.update(pd.util.hash_pandas_object(df[col], index=False).to_numpy().tobytes())
+    return h.digest()
+
+
+def cached_build(name, digest, build):
+    """Returns the object `build()` made for this data before, building it on a miss."""
+    key = (name, digest)
+    with _chart_cache_lock:
+        if key in _chart_cache:
+            _chart_cache.move_to_end(key)
+            return _chart_cache[key]
+    value = build()
+    with _chart_cache_lock:
+        _chart_cache[key] = value
+        while len(_chart_cache) > CHART_CACHE_MAXSIZE:
+            _chart_cache.popitem(last=False)
+    return value
+
+
+# -----------------------------
+# PLATINUM OVERVIEW FIGURE
+# -----------------------------
+def platinum_overview_figure(aggs):
+    """
+    Listings per Make, Average Price per Make and Top 5 Models by Revenue as
+    facets of one figure, built from a single tidy frame.
+    """
+    by_make = aggs["by_make"]
+    top_models = aggs["by_model"]["Revenue"].nlargest(5)
+    plot_df = pd.concat([
+        pd.DataFrame({"Metric": "Listings per Make", "Group": by_make.index, "Value": by_make["Count"].values}),
+        pd.DataFrame({"Metric": "Average Price per Make", "Group": by_make.index, "Value": by_make["Avg_Price"].values}),
+        pd.DataFrame({"Metric": "Top 5 Models by Revenue", "Group": top_models.index, "Value": top_models.values}),
+    ], ignore_index=True)
+
+    fig = px.bar(plot_df, x="Group", y="Value", facet_col="Metric", title="Make & Model Overview")
+    fig.update_xaxes(matches=None, showticklabels=True, title_text="")
+    fig.update_yaxes(matches=None, showticklabels=True)
+    fig.for_each_annotation(lambda a: a.update(text=a.text.split("=")[-1]))
+    return fig
+
+
 # -----------------------------
 # MAIN FUNCTION
 # -----------------------------
@@ -114,6 +176,19 @@ def show_analytics_dashboard(user_email, user_plan):
         filtered_df["Reach"] = (filtered_df["Reach"] * activity_multiplier).astype(int)
         filtered_df["Impressions"] = (filtered_df["Impressions"] * activity_multiplier).astype(int)
 
+    # -----------------------------
+    # SHARED AGGREGATES (Pro + Platinum)
+    # -----------------------------
+    if user_plan.lower() in ["pro", "platinum"]:
+        # Reruns over unchanged data reuse the aggregates and figures below
+        digest = frame_digest(filtered_df)
+        aggs = cached_build("aggregates", digest, lambda: dashboard_aggregates(filtered_df))
+        revenue_by_date = aggs["revenue_by_date"]
+        fig_revenue = cached_build("revenue", digest, lambda: px.line(
+            revenue_by_date,
+            x="Date", y="Revenue", title="Revenue Over Time"
+        ))
+
     # -----------------------------
     # PRO ANALYTICS
     # -----------------------------
@@ -122,25 +197,21 @@ def show_analytics_dashboard(user_email, user_plan):
         col1, col2, col3 = st.columns(3)
 
         with col1:
-            fig1 = px.bar(
-                filtered_df.groupby("Make")["Price"].mean().reset_index(),
+            fig1 = cached_build("avg_price_by_make", digest, lambda: px.bar(
+                aggs["by_make"]["Avg_Price"].rename("Price").reset_index(),
                 x="Make", y="Price", title="Average Price per Make"
-            )
+            ))
             st.plotly_chart(fig1, use_container_width=True)
 
         with col2:
-            fig2 = px.bar(
-                filtered_df.groupby("Model").size().reset_index(name="Count"),
+            fig2 = cached_build("listings_by_model", digest, lambda: px.bar(
+                aggs["by_model"]["Count"].reset_index(),
                 x="Model", y="Count", title="Listings per Model"
-            )
+            ))
             st.plotly_chart(fig2, use_container_width=True)
 
         with col3:
-            fig3 = px.line(
-                filtered_df.groupby("Date")["Revenue"].sum().reset_index(),
-                x="Date", y="Revenue", title="Revenue Over Time"
-            )
-            st.plotly_chart(fig3, use_container_width=True)
+            st.plotly_chart(fig_revenue, use_container_width=True)
 
     # -----------------------------
     # PLATINUM ANALYTICS
@@ -149,46 +220,20 @@ def show_analytics_dashboard(user_email, user_plan):
         st.subheader("🚀 Platinum Advanced Analytics")
 
         # Revenue Over Time
-        fig_revenue = px.line(
-            filtered_df.groupby("Date")["Revenue"].sum().reset_index(),
-            x="Date", y="Revenue", title="Revenue Over Time"
-        )
         st.plotly_chart(fig_revenue, use_container_width=True)
 
-        # Listings per Make
-        fig_make = px.bar(
-            filtered_df.groupby("Make").size().reset_index(name="Count"),
-            x="Make", y="Count", title="Listings per Make"
-        )
-        st.plotly_chart(fig_make, use_container_width=True)
-
-        # Avg Price per Make
-        fig_price = px.bar(
-            filtered_df.groupby("Make")["Price"].mean().reset_index(),
-            x="Make", y="Price", title="Average Price per Make"
-        )
-        st.plotly_chart(fig_price, use_container_width=True)
-
-        # Top 5 Models by Revenue
-        top_models = (
-            filtered_df.groupby("Model")["Revenue"]
-            .sum().reset_index()
-            .sort_values("Revenue", ascending=False)
-            .head(5)
-        )
-        fig_top_models = px.bar(
-            top_models, x="Model", y="Revenue", title="Top 5 Models by Revenue"
-        )
-        st.plotly_chart(fig_top_models, use_container_width=True)
+        # Listings per Make, Avg Price per Make, Top 5 Models by Revenue
+        fig_overview = cached_build("overview", digest, lambda: platinum_overview_figure(aggs))
+        st.plotly_chart(fig_overview, use_container_width=True)
 
         # Platform Performance
-        platform_stats = filtered_df.groupby("Platform")[["Reach", "Impressions", "Revenue"]].sum().reset_index()
-        fig_platform = px.bar(
-            platform_stats,
+        platform_stats = aggs["by_platform"]
+        fig_platform = cached_build("platform", digest, lambda: px.bar(
+            platform_stats.reset_index(),
             x="Platform", y=["Reach", "Impressions", "Revenue"],
             barmode="group",
             title="Platform Performance Comparison"
-        )
+        ))
         st.plotly_chart(fig_platform, use_container_width=True)
 
         # KPIs
@@ -203,7 +248,10 @@ def show_analytics_dashboard(user_email, user_plan):
 
         # AI Recommendations
         st.subheader("💡 AI Insights & Recommendations")
-        recs = platinum_recommendations(filtered_df)
+        recs = platinum_recommendations(
+            filtered_df,
+            aggs={"Platform": platform_stats["Revenue"], "Model": aggs["by_model"]["Revenue"]}
+        )
         for r in recs:
             st.markdown(f"- {r}")
 
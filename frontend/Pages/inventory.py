@@ -62,8 +62,7 @@ else:
                 st.experimental_rerun()
 # In Inventory tab
 st.markdown("### 📈 Your Inventory")
-df_inventory = get_sheet_data("Inventory")
-user_inventory = df_inventory[df_inventory["Email"].str.lower() == user_email.lower()]
+user_inventory = get_inventory_for_user(email)
 
 # Display image previews
 if not user_inventory.empty and "Image_Link" in user_inventory.columns:
@@ -3,7 +3,7 @@ import sys, os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
 import streamlit as st
-from backend.ai_generator import generate_listing
+from backend.ai_generator import generate_listing_stream
 from backend.trial_manager import maybe_increment_usage
 from backend.trial_manager import get_trial_status
 
@@ -39,9 +39,12 @@ if submitted:
         "price": price, "features": features, "notes": notes, "tone": tone
     }
     try:
-        listing_text = generate_listing(prompt_data)
         st.subheader("📋 Generated Listing")
-        st.markdown(listing_text)
+        listing_box = st.empty()
+        listing_text = ""
+        for chunk in generate_listing_stream(prompt_data):
+            listing_text += chunk
+            listing_box.markdown(listing_text)
         st.download_button("⬇ Download listing", listing_text, file_name="car_listing.txt")
         # save usage (will only increment if trial allows)
         maybe_increment_usage(email, listing_text)
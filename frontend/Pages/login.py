@@ -3,7 +3,7 @@ import sys, os, re
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
 import streamlit as st
-from backend.sheet_utils import append_to_google_sheet, get_sheet_data
+from backend.sheet_utils import append_to_google_sheet, get_rows_for_email
 from backend.auth_utils import hash_password, verify_password
 from backend.email_utils import send_reset_email  # We'll create this simple utility
 
@@ -64,8 +64,7 @@ with tab1:
     login_password = st.text_input("Password", type="password")
 
     if st.button("Login"):
-        sheet = get_sheet_data("Dealership_Profiles")
-        user_row = sheet[sheet["Email"].str.lower() == login_email.lower()]
+        user_row = get_rows_for_email("Dealership_Profiles", login_email)
 
         if user_row.empty:
             st.error("Account not found.")
@@ -142,8 +141,7 @@ with tab3:
     reset_email = st.text_input("Enter your email to reset password")
 
     if st.button("Send Reset Email"):
-        sheet = get_sheet_data("Dealership_Profiles")
-        user_row = sheet[sheet["Email"].str.lower() == reset_email.lower()]
+        user_row = get_rows_for_email("Dealership_Profiles", reset_email)
 
         if user_row.empty:
             st.error("No account found with this email.")
@@ -1,4 +1,5 @@
-import sys, os, io, json
+import sys, os, io, json, re
+import importlib.util
 import uuid
 import time
 from datetime import datetime, timedelta
@@ -24,6 +25,7 @@ from backend.trial_manager import (
     get_dealership_status,
     can_user_login
 )
+from backend.constants import TRIAL_DAYS
 from backend.sheet_utils import append_to_google_sheet, get_sheet_data, get_inventory_for_user, save_dealership_profile
 from backend.platinum_manager import (
     can_add_listing,
@@ -37,35 +39,65 @@ from backend.stripe_utils import create_checkout_session
 # ---------------------------------------------------------
 # GOOGLE DRIVE SETUP
 # ---------------------------------------------------------
-try:
+# Only checked for here (google-auth comes with it): googleapiclient is slow
+# to import, so it's loaded when the first upload builds the Drive client
+GOOGLE_API_AVAILABLE = importlib.util.find_spec("googleapiclient") is not None
+if not GOOGLE_API_AVAILABLE:
+    print("⚠️ googleapiclient not installed. Drive uploads disabled.")
+
+DRIVE_CHUNK_SIZE = 4 * 1024 * 1024  # multiple of 256 KB, as resumable uploads require
+DRIVE_RESUMABLE_THRESHOLD = 5 * 1024 * 1024  # Drive recommends resumable uploads above ~5 MB
+DRIVE_CHUNK_RETRIES = 3
+
+@st.cache_resource
+def get_drive_service():
+    """
+    Parses the service-account credentials and builds the Drive client once per
+    server process (module globals don't survive Streamlit reruns).
+    Returns None when credentials aren't configured.
+    """
+    raw = os.environ.get("GOOGLE_CREDENTIALS_JSON") or os.environ.get("GOOGLE_CREDENTIALS")
+    if not raw:
+        return None
     from google.oauth2.service_account import Credentials
     from googleapiclient.discovery import build
-    from googleapiclient.http import MediaIoBaseUpload
-    GOOGLE_API_AVAILABLE = True
-except ModuleNotFoundError:
-    GOOGLE_API_AVAILABLE = False
-    print("⚠️ googleapiclient not installed. Drive uploads disabled.")
+    info = json.loads(raw)
+    creds = Credentials.from_service_account_info(info, scopes=["https://www.googleapis.com/auth/drive"])
+    # Bundled discovery document; skips the on-disk discovery cache lookup
+    return build('drive', 'v3', credentials=creds, cache_discovery=False)
 
 def upload_image_to_drive(file_obj, filename, folder_id=None):
     if not GOOGLE_API_AVAILABLE:
         st.warning("⚠️ Google Drive upload unavailable.")
         return None
     try:
-        raw = os.environ.get("GOOGLE_CREDENTIALS_JSON") or os.environ.get("GOOGLE_CREDENTIALS")
-        if not raw:
+        service = get_drive_service()
+        if service is None:
             st.warning("⚠️ GOOGLE_CREDENTIALS not set in environment.")
             return None
-        info = json.loads(raw)
-        creds = Credentials.from_service_account_info(info, scopes=["https://www.googleapis.com/auth/drive"])
-        service = build('drive', 'v3', credentials=creds)
+        from googleapiclient.http import MediaIoBaseUpload
+        # Stream from the upload itself (no extra in-memory copy); only large
+        # files pay for a resumable session's extra round trip
+        size = file_obj.seek(0, io.SEEK_END)
         file_obj.seek(0)
-        media = MediaIoBaseUpload(io.BytesIO(file_obj.read()), mimetype="image/png")
+        media = MediaIoBaseUpload(
+            file_obj, mimetype="image/png",
+            chunksize=DRIVE_CHUNK_SIZE, resumable=size > DRIVE_RESUMABLE_THRESHOLD
+        )
         file_metadata = {"name": filename}
         if folder_id:
             file_metadata["parents"] = [folder_id]
-        uploaded = service.files().create(body=file_metadata, media_body=media, fields="id").execute()
+        request = service.files().create(body=file_metadata, media_body=media, fields="id")
+        if media.resumable():
+            # Chunk by chunk: a transient error retries the current chunk of the
+            # session rather than failing (and restarting) the whole upload
+            uploaded = None
+            while uploaded is None:
+                _, uploaded = request.next_chunk(num_retries=DRIVE_CHUNK_RETRIES)
+        else:
+            uploaded = request.execute()
         file_id = uploaded.get("id")
-        service.permissions().create(fileId=file_id, body={"role": "reader", "type": "anyone"}).execute()
+        service.permissions().create(fileId=file_id, body={"role": "reader", "type": "anyone"}, fields="id").execute()
         return f"https://drive.google.com/uc?id={file_id}"
     except Exception as e:
         print(f"⚠️ Failed to upload image: {e}")
@@ -160,7 +192,7 @@ if TRIAL_EXPIRY_DATE:
     is_trial_active = time_remaining.total_seconds() > 0
 else:
     # Fallback if Trial_Expiry is somehow missing or could not be parsed
-    trial_days_left = 30
+    trial_days_left = TRIAL_DAYS
     is_trial_active = True
 
 # current_plan logic simplified to rely on profile status
@@ -249,6 +281,41 @@ def get_car_image_url(make):
     return f"https://placehold.co/600x400/31363F/F0F7FF?text={text}"
 
 
+# pyarrow's multithreaded CSV parser when installed, pandas' C parser otherwise
+try:
+    import pyarrow  # noqa: F401
+    CSV_ENGINE = "pyarrow"
+except ModuleNotFoundError:
+    CSV_ENGINE = "c"
+
+# Characters stripped from text columns before numeric coercion, fused into
+# a single precompiled pattern per column so each column is scanned once.
+NUMERIC_STRIP_PATTERNS = {
+    "Price": re.compile("|".join(map(re.escape, ["£", ","]))),
+    "Mileage": re.compile("|".join(map(re.escape, [" miles", ","]))),
+}
+
+def to_numeric_column(series, col):
+    """Strips currency/unit characters for `col` in one pass and coerces to numbers."""
+    s = series.astype(str).str.strip().str.replace(NUMERIC_STRIP_PATTERNS[col], "", regex=True)
+    return pd.to_numeric(s, errors='coerce')
+
+
+def with_numeric_columns(df, fill_missing=False):
+    """
+    Adds a `<col>_num` column for each NUMERIC_STRIP_PATTERNS column in one
+    assign. With fill_missing, columns absent from `df` get an all-NaN
+    `<col>_num` (a single reindex) instead of being skipped.
+    """
+    parsed = pd.DataFrame(
+        {f"{col}_num": to_numeric_column(df[col], col) for col in NUMERIC_STRIP_PATTERNS if col in df.columns},
+        index=df.index
+    )
+    if fill_missing:
+        parsed = parsed.reindex(columns=[f"{col}_num" for col in NUMERIC_STRIP_PATTERNS])
+    return df.assign(**parsed)
+
+
 def get_user_inventory(email):
     """
     Fetches user inventory from the sheet, cleans columns, and parses numeric/date types 
@@ -265,19 +332,15 @@ def get_user_inventory(email):
         # Standardize timestamp parsing
         timestamp_col = next((c for c in df.columns if c.lower() in ["timestamp", "created", "created_at"]), None)
         if timestamp_col:
-            df["Timestamp_parsed"] = pd.to_datetime(df[timestamp_col], errors="coerce", utc=True)
+            # Stored via isoformat(): ISO8601 takes the fast path for every variant
+            # (with/without microseconds or offset) instead of inferring from row one
+            df["Timestamp_parsed"] = pd.to_datetime(df[timestamp_col], errors="coerce", utc=True, format="ISO8601")
             df.dropna(subset=["Timestamp_parsed"], inplace=True)
         else:
             df["Timestamp_parsed"] = pd.Timestamp.utcnow() # Fallback
 
         # Standardize numeric parsing
-        for num_col, chars in [("Price", ["£", ","]), ("Mileage", [" miles", ","])]:
-            if num_col in df.columns:
-                s = df[num_col].astype(str).str.strip()
-                for ch in chars:
-                    s = s.str.replace(ch, "", regex=False)
-                df[f"{num_col}_num"] = pd.to_numeric(s, errors='coerce')
-        return df
+        return with_numeric_columns(df)
     except Exception as e:
         print(f"Error in get_user_inventory: {e}")
         return pd.DataFrame()
@@ -288,7 +351,7 @@ def weekly_monthly_reports(df):
     if df.empty or "Timestamp_parsed" not in df.columns: 
         return pd.DataFrame(columns=['Week', 'Listings']), pd.DataFrame(columns=['Month', 'Listings'])
     
-    df["Week"] = df["Timestamp_parsed"].dt.to_period("W").apply(lambda r: r.start_time.date())
+    df["Week"] = df["Timestamp_parsed"].dt.to_period("W").dt.start_time.dt.date
     df["Month"] = df["Timestamp_parsed"].dt.to_period("M").astype(str)
     
     weekly_counts = df.groupby("Week").size().reset_index(name="Listings")
@@ -392,6 +455,9 @@ def render_dashboard(df, title_prefix="Inventory", show_summary=False, filter_ma
             else:
                  stale_action_insight = "Excellent inventory management with no units exceeding 90 days."
 
+    # Make counts, computed once for both the AI summary and the pie chart
+    make_counts = df_filtered["Make"].value_counts() if "Make" in df_filtered.columns else None
+
     # --- KPI Display (Now safe because total_count is guaranteed to have a value) ---
     st.markdown(f"### 📊 {title_prefix} Dashboard")
 
@@ -406,7 +472,7 @@ def render_dashboard(df, title_prefix="Inventory", show_summary=False, filter_ma
 Analyze the following inventory and market summary and provide a brief (3-4 sentence) summary of key insights and 1 actionable suggestion.
 Inventory size: {count}. Average Price: {avg_price}. 
 Average Days on Lot: {int(avg_days)} days. Stale Inventory (>90 days): {stale_percent:.1f}%.
-Top 3 Makes by Count: {df_filtered['Make'].value_counts().head(3).to_dict() if 'Make' in df_filtered.columns else 'N/A'}.
+Top 3 Makes by Count: {make_counts.head(3).to_dict() if make_counts is not None else 'N/A'}.
 Actionable Insight: {stale_action_insight}
 """
             # Use the fixed openai_generate function here
@@ -451,8 +517,8 @@ Actionable Insight: {stale_action_insight}
         plotly_chart(df_filtered, "scatter", x="Mileage_num", y="Price_num", color="Make", hover=["Model","Year"], title=f"{title_prefix}: Mileage vs Price")
     
     # Make pie chart
-    if "Make" in df_filtered.columns:
-        make_counts = df_filtered["Make"].value_counts().reset_index()
+    if make_counts is not None:
+        make_counts = make_counts.reset_index()
         make_counts.columns = ["Make","Count"]
         plotly_chart(make_counts, "pie", x="Make", y="Count", title=f"{title_prefix}: Inventory by Make")
 def render_custom_report(df, chart_type, x_col, y_col, color_col, size_col, agg_func, title):
@@ -658,17 +724,18 @@ with main_tabs[1]:
             if 'df_custom_upload_name' not in st.session_state or st.session_state['df_custom_upload_name'] != uploaded_file.name:
                 # 1. Load and parse CSV data and store in session state (only if new file)
                 try:
-                    df_custom = pd.read_csv(uploaded_file)
+                    df_custom = pd.read_csv(uploaded_file, engine=CSV_ENGINE)
                     df_custom.columns = [str(c).strip() for c in df_custom.columns]
                     
                     # Apply data cleaning (similar to get_user_inventory)
-                    df_custom['Price_num'] = pd.to_numeric(df_custom.get('Price', pd.Series()).astype(str).str.replace('£', '', regex=False).str.replace(',', '', regex=False), errors='coerce')
-                    df_custom['Mileage_num'] = pd.to_numeric(df_custom.get('Mileage', pd.Series()).astype(str).str.replace(' miles', '', regex=False).str.replace(',', '', regex=False), errors='coerce')
+                    df_custom = with_numeric_columns(df_custom, fill_missing=True)
                     
-                    if 'Timestamp' in df_custom.columns:
-                        df_custom['Timestamp_parsed'] = pd.to_datetime(df_custom['Timestamp'], errors='coerce', utc=True)
-                    else:
-                        df_custom['Timestamp_parsed'] = datetime.utcnow()
+                    # One assign either way; the fallback is a tz-aware scalar like the
+                    # parsed branch, so both branches give a UTC-aware column
+                    df_custom['Timestamp_parsed'] = (
+                        pd.to_datetime(df_custom['Timestamp'], errors='coerce', utc=True)
+                        if 'Timestamp' in df_custom.columns else pd.Timestamp.now(tz="UTC")
+                    )
                     
                     st.session_state['df_custom_upload'] = df_custom
                     st.session_state['df_custom_upload_name'] = uploaded_file.name
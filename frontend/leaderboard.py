@@ -2,7 +2,6 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 import gspread
-from oauth2client.service_account import ServiceAccountCredentials
 import os
 
 # ----------------------------
@@ -38,10 +37,25 @@ st.markdown("---")
 # ----------------------------
 scope = ["https://spreadsheets.google.com/feeds", "https://www.googleapis.com/auth/drive"]
 
+@st.cache_resource
+def get_gspread_client():
+    """
+    Authorises once per server process; reruns reuse the client and its token.
+    google-auth credentials refresh the token themselves shortly before it
+    expires, so the cached client never needs rebuilding.
+    """
+    return gspread.service_account_from_dict(dict(st.secrets["gcp_service_account"]), scopes=scope)
+
+@st.cache_resource
+def get_worksheet(sheet_name):
+    """
+    First tab of `sheet_name`, opened once per process (the handle doesn't go
+    stale); get_sheet_data drops it if a read through it fails.
+    """
+    return get_gspread_client().open(sheet_name).sheet1
+
 try:
-    creds = ServiceAccountCredentials.from_json_keyfile_dict(
-        st.secrets["gcp_service_account"], scope)
-    client = gspread.authorize(creds)
+    client = get_gspread_client()
 except Exception as e:
     client = None
     st.warning("⚠️ Running in demo mode (no live data connection).")
@@ -49,12 +63,21 @@ except Exception as e:
 # ----------------------------
 # LOAD DATA
 # ----------------------------
+SHEET_CACHE_TTL = 60  # seconds; the leaderboard doesn't need to be fresher than this
+
+@st.cache_data(ttl=SHEET_CACHE_TTL)
+def read_sheet(sheet_name):
+    """All records of `sheet_name`, fetched at most once per TTL; failures raise and aren't cached."""
+    return pd.DataFrame(get_worksheet(sheet_name).get_all_records())
+
 def get_sheet_data(sheet_name):
+    if client is None:
+        return pd.DataFrame()
     try:
-        sheet = client.open(sheet_name).sheet1
-        data = sheet.get_all_records()
-        return pd.DataFrame(data)
+        return read_sheet(sheet_name)
     except Exception:
+        # Spreadsheet moved, renamed or re-shared: reopen on the next run
+        get_worksheet.clear()
         return pd.DataFrame()
 
 sheet_name = "AI_Metrics"